@@ -25,6 +25,8 @@ import matplotlib.pyplot as plt
 from src.utils.config import Config
 from src.utils.logging_setup import setup_logger
 from src.utils.run_metadata import write_run_metadata
+from src.utils.io import read_csv_arrow
+from src.utils.text import clean_str
 
 
 # ---------------------------------------------------------------------
@@ -53,7 +55,7 @@ def load_rotation(rot_file: Path) -> pd.DataFrame:
     if not rot_file.exists():
         raise FileNotFoundError(f"Rotation proxy not found: {rot_file}")
 
-    df = pd.read_csv(rot_file)
+    df = read_csv_arrow(rot_file)
     df.columns = [c.strip() for c in df.columns]
 
     required = {"season", "player_name", "team_id", "rotation_elasticity"}
@@ -62,8 +64,8 @@ def load_rotation(rot_file: Path) -> pd.DataFrame:
         raise ValueError(f"Rotation proxy missing columns: {sorted(missing)}. Columns={list(df.columns)}")
 
     df["season"] = pd.to_numeric(df["season"], errors="coerce").astype("Int64")
-    df["player_name"] = df["player_name"].astype(str).str.strip()
-    df["team_id"] = df["team_id"].astype(str).str.strip()
+    df["player_name"] = clean_str(df["player_name"])
+    df["team_id"] = clean_str(df["team_id"])
     df["rotation_elasticity"] = pd.to_numeric(df["rotation_elasticity"], errors="coerce")
 
     # Drops rows unusable for plots
@@ -143,10 +145,11 @@ def plot_team_boxplot_rotation(df: pd.DataFrame, fig_dir: Path, logger=None) ->
             logger.warning("No rotation_elasticity data; skipping team boxplot.")
         return
 
-    # Order teams by median elasticity for readability
-    med = sub.groupby("team_id")["rotation_elasticity"].median().sort_values()
-    ordered_teams = med.index.tolist()
-    sub["team_id"] = pd.Categorical(sub["team_id"], categories=ordered_teams, ordered=True)
+    # Order teams by median elasticity for readability: encode team_id once, take medians per
+    # code, then only reorder the (few) categories instead of re-encoding the column
+    teams = pd.Categorical(sub["team_id"])
+    med = sub["rotation_elasticity"].groupby(teams.codes).median().sort_values()
+    sub["team_id"] = teams.reorder_categories(teams.categories[med.index], ordered=True)
 
     plt.figure(figsize=(12, 6))
     sub.boxplot(column="rotation_elasticity", by="team_id")
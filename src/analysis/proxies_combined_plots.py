@@ -12,9 +12,16 @@ Output:
 from __future__ import annotations
 from pathlib import Path
 import argparse
+import math
 
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+
+# Headless-safe backend (must be set before importing pyplot)
+import matplotlib
+matplotlib.use("Agg")  # noqa: E402
+
+import matplotlib.pyplot as plt  # noqa: E402
 
 from src.utils.config import Config
 from src.utils.logging_setup import setup_logger
@@ -126,6 +133,7 @@ def main() -> None:
         raise ValueError(f"'rotation_elasticity' not found. Columns: {list(df.columns)}")
 
     y_col = pick_y_col(df, args.y_col)
+    logger.info("Using y-axis column: %s", y_col)
 
     # Coerce numeric
     df["rotation_elasticity"] = pd.to_numeric(df["rotation_elasticity"], errors="coerce")
@@ -141,8 +149,13 @@ def main() -> None:
         print("No overlap between proxies after numeric coercion; skipping plot.")
         return
 
-    corr = sub["rotation_elasticity"].corr(sub[y_col])
-    if pd.isna(corr):
+    # Both columns are clean floats after the dropna: correlate the raw arrays
+    # (constant or single-row series give NaN, as Series.corr does)
+    x = sub["rotation_elasticity"].to_numpy(dtype="float64")
+    y = sub[y_col].to_numpy(dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = float(np.corrcoef(x, y)[0, 1]) if n > 1 else math.nan
+    if math.isnan(corr):
         print(f"Correlation (rotation_elasticity vs {y_col}): NaN")
         logger.info("Correlation is NaN (likely constant series or insufficient variation).")
     else:
@@ -154,18 +167,20 @@ def main() -> None:
         return
 
     fig_dir.mkdir(parents=True, exist_ok=True)
-
-    plt.figure(figsize=(7, 5))
-    plt.scatter(sub["rotation_elasticity"], sub[y_col])
-    plt.axvline(0, linestyle="--")
-    plt.axhline(0, linestyle="--")
-    plt.xlabel("Rotation elasticity (hard - easy)")
-    plt.ylabel(f"Injury impact in xPts ({y_col})")
-    plt.title("Relationship between rotation role and injury impact")
-    plt.tight_layout()
-
-    plt.savefig(out_path, dpi=150)
-    plt.close()
+    # --out may point outside fig_dir
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    fig, ax = plt.subplots(figsize=(7, 5))
+    ax.scatter(x, y)
+    ax.axvline(0, linestyle="--")
+    ax.axhline(0, linestyle="--")
+    ax.set_xlabel("Rotation elasticity (hard - easy)")
+    ax.set_ylabel(f"Injury impact in xPts ({y_col})")
+    ax.set_title("Relationship between rotation role and injury impact")
+    fig.tight_layout()
+
+    fig.savefig(out_path, dpi=150)
+    plt.close(fig)
 
     print(f"Saved {out_path}")
     logger.info("Saved figure: %s", out_path)
@@ -30,6 +30,7 @@ from src.utils.config import Config
 from src.utils.io import atomic_write_csv
 from src.utils.logging_setup import setup_logger
 from src.utils.run_metadata import write_run_metadata
+from src.utils.text import map_unique
 
 
 # ---------------------------------------------------------------------
@@ -75,6 +76,11 @@ def standardise_team_name_injuries(name: str) -> str:
     return INJURIES_TEAM_MAP.get(str(name), str(name))
 
 
+def standardise_team_column_injuries(s: pd.Series) -> pd.Series:
+    """Apply standardise_team_name_injuries once per distinct club name (NaN stays NaN)."""
+    return map_unique(s, standardise_team_name_injuries, skipna=True)
+
+
 def _season_files_default() -> list[tuple[str, str]]:
     """
     Default mapping from season labels to filenames written by fetch_injuries_tm.py.
@@ -116,7 +122,7 @@ def load_one_season(injuries_dir: Path, season_label: str, filename: str, logger
     df["season_start_year"] = int(season_label[:4])
 
     # Standardise team names
-    df["team"] = df["team"].apply(standardise_team_name_injuries)
+    df["team"] = standardise_team_column_injuries(df["team"])
 
     logger.info("Loaded season=%s file=%s shape=%s", season_label, filename, df.shape)
     return df
@@ -143,8 +149,8 @@ def combine_seasons(
     combined = pd.concat(frames, ignore_index=True)
 
     # Parse dates to datetime and drop invalid rows
-    combined["start_date"] = pd.to_datetime(combined["start_date"], errors="coerce")
-    combined["end_date"] = pd.to_datetime(combined["end_date"], errors="coerce")
+    combined["start_date"] = pd.to_datetime(combined["start_date"], errors="coerce", format="ISO8601")
+    combined["end_date"] = pd.to_datetime(combined["end_date"], errors="coerce", format="ISO8601")
     combined = combined.dropna(subset=["start_date", "end_date"])
 
     # Strip whitespace in common string columns
@@ -26,11 +26,16 @@ from pathlib import Path
 import argparse
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as pads
+import pyarrow.fs as pafs
 
 from src.utils.config import Config
-from src.utils.io import atomic_write_csv
+from src.utils.io import atomic_write_csv, read_csv_header, scan_csv_dataset
 from src.utils.logging_setup import setup_logger
 from src.utils.run_metadata import write_run_metadata
+from src.utils.text import map_unique
 
 
 # ---------------------------------------------------------------------
@@ -64,23 +69,59 @@ def standardise_team_name_understat(name: str) -> str:
     return UNDERSTAT_TEAM_MAP.get(str(name), str(name))
 
 
-def load_one_file(path: Path, logger) -> pd.DataFrame:
+def standardise_team_column_understat(s: pd.Series) -> pd.Series:
     """
-    Load one per-season Understat CSV and apply minimal cleaning/standardisation. Unmapped team names are left as-is.
+    Apply standardise_team_name_understat once per distinct team name and broadcast back by code.
 
-    Adds:
-    - match_date (datetime from Date)
-    - season_start_year (int)
-    - season_label (e.g. 2019-2020)
+    Only ~30 distinct names occur across all seasons, so this is O(unique) Python calls instead of
+    one per row. NaN rows keep their NaN (factorize code -1).
     """
-    df = pd.read_csv(path)
+    return map_unique(s, standardise_team_name_understat, skipna=True)
+
+
+# One block per season file (~1.2 MB each), so each file's types are inferred from all its rows
+_CSV_FORMAT = pads.CsvFileFormat(read_options=pacsv.ReadOptions(block_size=16 << 20))
+
 
-    missing = REQUIRED_COLS - set(df.columns)
+def check_one_file(path: Path, logger) -> list[str]:
+    """
+    Read one per-season Understat CSV's header and check its required columns.
+
+    Rows are read later in a single dataset scan over all files; cleaning/standardisation is
+    applied once to the concatenated master in clean_master().
+    """
+    header = read_csv_header(path)
+
+    missing = REQUIRED_COLS - set(header)
     if missing:
         raise ValueError(f"[{path.name}] Missing required columns: {sorted(missing)}")
 
-    # Understat dates are typically ISO format; default pandas parsing is sufficient.
-    df["match_date"] = pd.to_datetime(df["Date"], errors="coerce")
+    logger.info("Checked file=%s n_cols=%d", path.name, len(header))
+    return header
+
+
+def infer_schema(path: Path) -> pa.Schema:
+    """Infer Arrow column types for one season file (from all its rows; see _CSV_FORMAT)."""
+    return _CSV_FORMAT.inspect(str(path), filesystem=pafs.LocalFileSystem())
+
+
+def scan_files(files: list[Path], schema: pa.Schema) -> pa.Table:
+    """Read all season files in one multi-threaded dataset scan, parsing straight into schema."""
+    return pads.dataset([str(f) for f in files], schema=schema, format=_CSV_FORMAT).to_table(use_threads=True)
+
+
+def clean_master(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Apply minimal cleaning/standardisation to the combined Understat rows. Unmapped team names are left as-is.
+
+    Adds:
+    - match_date (datetime from Date)
+    - season_start_year (int)
+    - season_label (e.g. 2019-2020)
+    """
+    # Understat dates are ISO format (Arrow already parses them to datetime64 on read; the
+    # explicit format keeps string input off pandas' per-element format inference).
+    df["match_date"] = pd.to_datetime(df["Date"], errors="coerce", format="ISO8601")
 
     # In these exports, Understat 'season' is the starting year (2019 => 2019-2020)
     df["season_start_year"] = pd.to_numeric(df["season"], errors="coerce").astype("Int64")
@@ -94,9 +135,8 @@ def load_one_file(path: Path, logger) -> pd.DataFrame:
     # Standardise team columns (if present)
     for col in ["team", "h_team", "a_team"]:
         if col in df.columns:
-            df[col] = df[col].apply(standardise_team_name_understat)
+            df[col] = standardise_team_column_understat(df[col])
 
-    logger.info("Loaded file=%s shape=%s", path.name, df.shape)
     return df
 
 
@@ -106,13 +146,25 @@ def build_understat_master(raw_understat_dir: Path, logger) -> pd.DataFrame:
     if not files:
         raise FileNotFoundError(f"No understat_player_matches_20*.csv files found in: {raw_understat_dir}")
 
-    frames: list[pd.DataFrame] = []
+    headers: list[list[str]] = []
     for f in files:
         logger.info("Reading %s", f)
         print(f"Reading {f.name} ...")
-        frames.append(load_one_file(f, logger))
-
-    master = pd.concat(frames, ignore_index=True)
+        headers.append(check_one_file(f, logger))
+
+    # The season exports share one layout, so types are inferred once (first season) and every
+    # file is parsed directly into that schema. If a season has different columns or a value
+    # that does not fit (e.g. a float in a column that was all-int in the first season), fall
+    # back to inferring every file and widening permissively (int -> double).
+    table = scan_csv_dataset(files, _CSV_FORMAT, schema=infer_schema(files[0]), headers=headers)
+    if table is None:
+        logger.info("Season files do not share the first file's layout/types; inferring per file.")
+        schema = pa.unify_schemas([infer_schema(f) for f in files], promote_options="permissive")
+        table = scan_files(files, schema)
+
+    # Rows are materialised once as one Arrow table and converted to pandas once
+    master = table.to_pandas(date_as_object=False)
+    master = clean_master(master)
 
     if len(master) == 0:
         raise ValueError("Understat master is empty after cleaning. Check date/season parsing and input files.")
@@ -21,7 +21,8 @@ import pandas as pd
 from src.utils.config import Config
 from src.utils.logging_setup import setup_logger
 from src.utils.run_metadata import write_run_metadata
-from src.utils.io import atomic_write_csv
+from src.utils.io import atomic_write_csv, atomic_write_parquet
+from src.utils.text import clean_str
 
 
 # ---------------------------------------------------------------------
@@ -41,8 +42,6 @@ def load_matches(path: Path) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"Matches file not found: {path}")
 
-    df = pd.read_csv(path)
-
     rename = {
         "Season": "season_label",
         "MatchID": "match_id",
@@ -52,6 +51,9 @@ def load_matches(path: Path) -> pd.DataFrame:
         "xPts": "xpts",
         "injured_players": "n_injured_squad",
     }
+    # Parse only the renamed source columns, so the rename touches (and copies) just those and
+    # no other column can collide with a target name
+    df = pd.read_csv(path, usecols=lambda c: c in rename)
     df = df.rename(columns=rename)
 
     required = {"season_label", "match_id", "date", "team_id", "opponent_id", "xpts", "n_injured_squad"}
@@ -59,22 +61,21 @@ def load_matches(path: Path) -> pd.DataFrame:
     if missing:
         raise ValueError(f"[build_injury_panel] Matches missing columns: {sorted(missing)}")
 
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["date"] = pd.to_datetime(df["date"], errors="coerce", format="ISO8601")
     bad_dates = int(df["date"].isna().sum())
     if bad_dates:
         raise ValueError(f"[build_injury_panel] Matches has {bad_dates} rows with invalid dates.")
 
-    df["season"] = df["season_label"].astype(str).str.slice(0, 4).astype(int)
-    df["team_id"] = df["team_id"].astype(str).str.strip()
-    df["opponent_id"] = df["opponent_id"].astype(str).str.strip()
+    df["season"] = df["season_label"].astype(str).str.slice(0, 4).astype("int16")
+    df["match_id"] = df["match_id"].astype("int32")
+    df["team_id"] = clean_str(df["team_id"])
+    df["opponent_id"] = clean_str(df["opponent_id"])
     df["xpts"] = pd.to_numeric(df["xpts"], errors="coerce")
-    df["n_injured_squad"] = pd.to_numeric(df["n_injured_squad"], errors="coerce").fillna(0).astype(int)
-
-    out = df[
-        ["match_id", "season", "season_label", "date", "team_id", "opponent_id", "xpts", "n_injured_squad"]
-    ].copy()
+    df["n_injured_squad"] = pd.to_numeric(df["n_injured_squad"], errors="coerce").fillna(0).astype("int16")
 
-    return out
+    return df.loc[
+        :, ["match_id", "season", "season_label", "date", "team_id", "opponent_id", "xpts", "n_injured_squad"]
+    ]
 
 
 def load_injury_spells(path: Path) -> pd.DataFrame:
@@ -99,10 +100,10 @@ def load_injury_spells(path: Path) -> pd.DataFrame:
 
     spells = pd.DataFrame(
         {
-            "player_name": df["player_name"].astype(str).str.strip(),
-            "team_id": df["team"].astype(str).str.strip(),
-            "start_date": pd.to_datetime(df["start_date"], errors="coerce"),
-            "end_date": pd.to_datetime(df["end_date"], errors="coerce"),
+            "player_name": clean_str(df["player_name"]),
+            "team_id": clean_str(df["team"]),
+            "start_date": pd.to_datetime(df["start_date"], errors="coerce", format="ISO8601"),
+            "end_date": pd.to_datetime(df["end_date"], errors="coerce", format="ISO8601"),
             "season_label": df["season"].astype(str),
         }
     ).dropna(subset=["start_date", "end_date"])
@@ -114,10 +115,13 @@ def load_injury_spells(path: Path) -> pd.DataFrame:
         spells.loc[flip, "start_date"] = spells.loc[flip, "end_date"]
         spells.loc[flip, "end_date"] = tmp
 
-    spells["season"] = spells["season_label"].str.slice(0, 4).astype(int)
+    spells["season"] = spells["season_label"].str.slice(0, 4).astype("int16")
 
-    out = spells[["player_name", "team_id", "season", "start_date", "end_date"]].copy()
-    return out
+    return spells.loc[:, ["player_name", "team_id", "season", "start_date", "end_date"]]
+
+
+# Understat master columns used below (date/season each come from the first available variant)
+_UNDERSTAT_COLS = {"match_date", "Date", "date", "season_start_year", "season", "team", "player_name", "Min", "started"}
 
 
 def load_understat_minutes(path: Path) -> pd.DataFrame:
@@ -138,16 +142,16 @@ def load_understat_minutes(path: Path) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"Understat master not found: {path}")
 
-    df = pd.read_csv(path)
+    df = pd.read_csv(path, usecols=lambda c: c in _UNDERSTAT_COLS)
 
     date_col = next((c for c in ["match_date", "Date", "date"] if c in df.columns), None)
     if date_col is None:
         raise ValueError(f"[build_injury_panel] Understat has no date column. Columns={list(df.columns)}")
 
     if "season_start_year" in df.columns:
-        season_series = df["season_start_year"].astype(int)
+        season_series = df["season_start_year"].astype("int16")
     elif "season" in df.columns:
-        season_series = df["season"].astype(str).str.slice(0, 4).astype(int)
+        season_series = df["season"].astype(str).str.slice(0, 4).astype("int16")
     else:
         raise ValueError(f"[build_injury_panel] Understat has no season column. Columns={list(df.columns)}")
 
@@ -159,10 +163,10 @@ def load_understat_minutes(path: Path) -> pd.DataFrame:
     out = pd.DataFrame(
         {
             "season": season_series,
-            "date": pd.to_datetime(df[date_col], errors="coerce"),
-            "team_id": df["team"].astype(str).str.strip(),
-            "player_name": df["player_name"].astype(str).str.strip(),
-            "minutes": pd.to_numeric(df["Min"], errors="coerce").fillna(0.0),
+            "date": pd.to_datetime(df[date_col], errors="coerce", format="ISO8601"),
+            "team_id": clean_str(df["team"]),
+            "player_name": clean_str(df["player_name"]),
+            "minutes": pd.to_numeric(df["Min"], errors="coerce").fillna(0.0).astype("float32"),
             "started": df["started"].astype("boolean"),
         }
     ).dropna(subset=["date"])
@@ -205,10 +209,10 @@ def build_injury_panel(
     # Player–team–season universe (players who ever had a spell)
     pts = spells2[["player_name", "team_id", "season"]].drop_duplicates()
 
-    # Team–season match set
-    tsm = matches[
-        ["match_id", "season", "season_label", "date", "team_id", "opponent_id", "xpts", "n_injured_squad"]
-    ].copy()
+    # Team–season match set (read-only; merge below builds a new frame)
+    tsm = matches.loc[
+        :, ["match_id", "season", "season_label", "date", "team_id", "opponent_id", "xpts", "n_injured_squad"]
+    ]
 
     # Cross join: each player-team-season gets all matches for that team-season
     base = pts.merge(tsm, on=["team_id", "season"], how="left")
@@ -222,7 +226,7 @@ def build_injury_panel(
     )
     # Spell interval treated as inclusive on both endpoints.
     in_spell = (tmp["date"] >= tmp["start_date"]) & (tmp["date"] <= tmp["end_date"])
-    tmp["unavailable_raw"] = in_spell.fillna(False).astype(int)
+    tmp["unavailable_raw"] = in_spell.fillna(False).astype("int8")
 
     panel = (
         tmp.groupby(["match_id", "team_id", "player_name"], as_index=False)
@@ -245,7 +249,7 @@ def build_injury_panel(
             how="left",
             validate="many_to_one",
         )
-        panel["minutes"] = panel["minutes"].fillna(0.0).astype(float)
+        panel["minutes"] = panel["minutes"].fillna(0.0).astype("float32")
         panel["started"] = panel["started"].fillna(False).astype(bool)
     else:
         panel["minutes"] = 0.0
@@ -275,7 +279,7 @@ def build_injury_panel(
         "minutes",
         "started",
     ]
-    panel = panel[cols].copy()
+    panel = panel.loc[:, cols]
 
     if logger:
         logger.info("Injury panel built: shape=%s | unavailable_rate=%.3f",
@@ -334,7 +338,7 @@ def main() -> None:
     args.out_parquet.parent.mkdir(parents=True, exist_ok=True)
 
     atomic_write_csv(panel, args.out_csv, index=False)
-    panel.to_parquet(args.out_parquet, index=False)
+    atomic_write_parquet(panel, args.out_parquet)
 
     logger.info("Wrote outputs: csv=%s parquet=%s", args.out_csv, args.out_parquet)
     print(f"✅ wrote panel | shape={panel.shape}")
@@ -6,41 +6,78 @@ Build a player–team–match rotation panel by joining:
 
 Output (one row per player–team–match):
   - <cfg.processed>/panel_rotation.csv
-  - <cfg.processed>/panel_rotation.parquet   (optional; skipped if parquet engine missing)
+  - <cfg.processed>/panel_rotation.parquet   (optional; zstd-compressed, skipped on write failure)
 
 Notes:
 - This script is a preprocessing/proxy-builder step. main.py may read the already-produced
   CSV rather than rebuilding from scratch.
 - Can use --dry-run to validate inputs, merges, and output schema without writing files.
+- The parquet footer records a fingerprint of the inputs; if it matches on the next run the
+  rebuild is skipped (use --force to rebuild anyway).
 """
 
 from __future__ import annotations
 from pathlib import Path
 import argparse
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 
+from src.utils import io as io_utils
 from src.utils.config import Config
-from src.utils.io import atomic_write_csv
+from src.utils.io import (
+    atomic_write_csv,
+    atomic_write_parquet,
+    read_csv_arrow,
+    read_source_key,
+    source_key,
+    with_source_key,
+)
 from src.utils.logging_setup import setup_logger
 from src.utils.run_metadata import write_run_metadata
+from src.validation import checks
 from src.validation.checks import assert_non_empty, require_columns
 
+# Code the panel depends on: editing any of these invalidates a skipped rebuild
+_CODE_FILES = [Path(__file__), Path(io_utils.__file__), Path(checks.__file__)]
+
 
 # ----------------------------
 # Helpers
 # ----------------------------
 
 def _normalize_date(s: pd.Series) -> pd.Series:
-    """Normalize timestamps to midnight (date-only) so joins are robust to time components."""
-    return pd.to_datetime(s, errors="coerce").dt.normalize()
+    """
+    Parse to day precision (date-only) so joins are robust to time components.
+
+    numpy's datetime64[D] cast floors to the day directly, skipping the separate
+    normalize pass; pandas stores the result at its coarsest unit (datetime64[s]).
+    """
+    days = pd.to_datetime(s, errors="coerce", format="ISO8601").to_numpy().astype("datetime64[D]")
+    return pd.Series(days, index=s.index, name=s.name)
 
 
 def _assert_unique_keys(df: pd.DataFrame, keys: list[str], name: str, logger) -> None:
-    """Fail fast if keys are not unique (prevents many-to-many merges)."""
+    """
+    Fail fast if keys are not unique (prevents many-to-many merges).
+
+    The common (unique) case is checked without per-row tuple hashing: each key is factorized
+    to int codes (NaN/NaT share a code, as in duplicated), rows are lexsorted on the codes, and
+    any duplicate must then equal its neighbour on every key. duplicated() is only used to
+    build the error report.
+    """
     require_columns(df, keys, name=name)
-    dup = df.duplicated(keys).sum()
-    if dup > 0:
+    if len(df) < 2:
+        return
+    codes = [pd.factorize(df[k], use_na_sentinel=False)[0] for k in keys]
+    order = np.lexsort(codes[::-1])
+    same = np.ones(len(df) - 1, dtype=bool)
+    for c in codes:
+        c = c[order]
+        same &= c[1:] == c[:-1]
+    if same.any():
+        dup = int(same.sum())
         example = df.loc[df.duplicated(keys, keep=False), keys].head(10)
         msg = f"[{name}] Found {dup} duplicate rows on keys={keys}. Example:\n{example}"
         logger.error(msg)
@@ -51,6 +88,22 @@ def _assert_unique_keys(df: pd.DataFrame, keys: list[str], name: str, logger) ->
 # Loaders
 # ----------------------------
 
+# Columns read from each input (everything else in the files is skipped by the parser)
+_MATCH_COLS = {"Season", "MatchID", "Date", "Team", "Opponent", "is_home", "xPts"}
+_UNDERSTAT_COLS = {
+    "match_date", "Date", "date", "season_start_year", "season",
+    "team", "player_id", "player_name", "Min", "started",
+}
+
+# Recognised spellings of Understat's 'started' flag (anything else parses as False)
+_STARTED_TRUE = {"true": True, "false": False, "1": True, "0": False, "yes": True, "no": False}
+# The same spellings (in the usual cases) for Arrow's C++ boolean parser
+_STARTED_ARROW = {
+    True: ["true", "True", "TRUE", "1", "yes", "Yes", "YES"],
+    False: ["false", "False", "FALSE", "0", "no", "No", "NO"],
+}
+
+
 def load_matches(matches_path: Path, logger) -> pd.DataFrame:
     """
     Load team–match data with xPts.
@@ -63,13 +116,22 @@ def load_matches(matches_path: Path, logger) -> pd.DataFrame:
 
     Uniqueness:
       Enforces uniqueness on (season, date, team_id), which should be one row per team per league match.
+
+    Integer columns are downcast (season int16, match_id int32) to halve bytes touched in the
+    join/write. xpts stays float64: Proxy 1 splits it into terciles, and float32 rounding
+    moves matches across the tercile cut points.
     """
     if not matches_path.exists():
         raise FileNotFoundError(
             f"{matches_path} not found. Run build_match_panel.py and add_injuries_to_matches.py first."
         )
 
-    df = pd.read_csv(matches_path)
+    # Parse only the needed columns, straight into their final numeric dtypes
+    df = read_csv_arrow(
+        matches_path,
+        columns=_MATCH_COLS,
+        column_types={"Season": pa.string(), "MatchID": pa.int32(), "xPts": pa.float64()},
+    )
 
     require_columns(
         df,
@@ -80,17 +142,17 @@ def load_matches(matches_path: Path, logger) -> pd.DataFrame:
     out = pd.DataFrame(
         {
             "season_label": df["Season"].astype(str),
-            "match_id": pd.to_numeric(df["MatchID"], errors="coerce"),
+            "match_id": df["MatchID"],
             "team_id": df["Team"].astype(str),
             "opponent_id": df["Opponent"].astype(str),
             "date": _normalize_date(df["Date"]),
             "is_home": df["is_home"].astype(bool),
-            "xpts": pd.to_numeric(df["xPts"], errors="coerce"),
+            "xpts": df["xPts"],
         }
     )
 
     # "2019-2020" -> 2019
-    out["season"] = out["season_label"].str.slice(0, 4).astype(int)
+    out["season"] = out["season_label"].str.slice(0, 4).astype("int16")
 
     assert_non_empty(out, "matches_clean")
     require_columns(out, ["season", "date", "team_id", "match_id"], name="matches_clean")
@@ -113,13 +175,20 @@ def load_understat_minutes(understat_path: Path, logger) -> pd.DataFrame:
 
     Returns (standardised schema):
       season, date, team_id, player_id, player_name, minutes, started
+      (season int16, player_id Int32, minutes float32)
     """
     if not understat_path.exists():
         raise FileNotFoundError(
             f"{understat_path} not found. Run build_understat_master.py first."
         )
 
-    df = pd.read_csv(understat_path)
+    df = read_csv_arrow(
+        understat_path,
+        columns=_UNDERSTAT_COLS,
+        column_types={"season_start_year": pa.int16(), "player_id": pa.int32(), "Min": pa.float32()},
+        true_values=_STARTED_ARROW[True],
+        false_values=_STARTED_ARROW[False],
+    )
 
     # Date column
     date_col = next((c for c in ["match_date", "Date", "date"] if c in df.columns), None)
@@ -131,7 +200,7 @@ def load_understat_minutes(understat_path: Path, logger) -> pd.DataFrame:
 
     # Season column
     if "season_start_year" in df.columns:
-        season = pd.to_numeric(df["season_start_year"], errors="coerce").astype("Int64")
+        season = df["season_start_year"]
     elif "season" in df.columns:
         # allow either 2019 or "2019-2020" formats
         season = (
@@ -151,25 +220,25 @@ def load_understat_minutes(understat_path: Path, logger) -> pd.DataFrame:
 
     out = pd.DataFrame(
         {
-            "season": season.astype(int),
+            "season": season.astype("int16"),
             "date": _normalize_date(df[date_col]),
             "team_id": df["team"].astype(str),
-            "player_id": pd.to_numeric(df["player_id"], errors="coerce").astype("Int64"),
+            "player_id": df["player_id"].astype("Int32"),
             "player_name": df["player_name"].astype(str),
-            "minutes": pd.to_numeric(df["Min"], errors="coerce").fillna(0).astype(float),
+            "minutes": df["Min"].fillna(0),
             "started": df["started"],
         }
     )
 
-    # Coerce started -> bool robustly (handles strings like "True"/"False"/"1"/"0")
+    # Coerce started -> bool robustly (handles strings like "True"/"False"/"1"/"0").
+    # Arrow already parses the recognised spellings to bool; an object column only remains if
+    # the file has blanks or other spellings (e.g. padded with spaces). Only a handful of
+    # distinct spellings exist, so parse each distinct value once and broadcast the result
+    # through the factorize codes (one bool LUT gather per row).
     if out["started"].dtype == object:
-        out["started"] = (
-            out["started"]
-            .astype(str)
-            .str.strip()
-            .str.lower()
-            .map({"true": True, "false": False, "1": True, "0": False, "yes": True, "no": False})
-        )
+        codes, uniques = pd.factorize(out["started"], use_na_sentinel=False)
+        lut = np.array([_STARTED_TRUE.get(str(u).strip().lower(), False) for u in uniques], dtype=bool)
+        out["started"] = lut[codes]
     out["started"] = out["started"].fillna(False).astype(bool)
 
     assert_non_empty(out, "understat_minutes")
@@ -183,11 +252,17 @@ def load_understat_minutes(understat_path: Path, logger) -> pd.DataFrame:
 # Core build
 # ----------------------------
 
-def build_rotation_panel(matches: pd.DataFrame, under: pd.DataFrame, logger) -> pd.DataFrame:
+def build_rotation_panel(matches: pd.DataFrame, under: pd.DataFrame, logger) -> pa.Table:
     """
     Join Understat player-match rows to the league match panel by (season, date, team_id).
 
+    Returns the panel as an Arrow table: join -> sort -> days_rest -> projection run as one
+    Arrow pipeline, so no intermediate pandas frame is built (main converts it once, for the
+    CSV, and writes the parquet from the table).
+
     Notes:
+    - The join runs in Arrow's multi-threaded hash-join engine (pyarrow is already a
+      pipeline dependency) instead of pandas' single-threaded merge.
     - The merge is inner: Understat rows that do not match a league fixture are dropped
       (these are typically cup matches, friendlies, or date mismatches).
     - days_rest is computed as days since the player's previous Understat appearance
@@ -195,16 +270,37 @@ def build_rotation_panel(matches: pd.DataFrame, under: pd.DataFrame, logger) ->
     """
     before = len(under)
 
+    # Join on int16 team codes from one shared category list rather than hashing team-name
+    # strings; the Understat side keeps its team_id string for the output.
+    teams = pd.CategoricalDtype(sorted(set(matches["team_id"]).union(under["team_id"])))
+    under_code = under["team_id"].astype(teams).cat.codes.to_numpy().astype("int16")
+    match_code = matches["team_id"].astype(teams).cat.codes.to_numpy().astype("int16")
+
+    # Drop Understat rows for (season, team) pairs with no league fixtures at all before building
+    # the join's hash table; rows within those pairs can only ever fail to match.
+    n_teams = len(teams.categories)
+    season_team = under["season"].to_numpy().astype("int64") * n_teams + under_code
+    keep = np.isin(season_team, matches["season"].to_numpy().astype("int64") * n_teams + match_code)
+
+    # under_row carries each Understat row's position through the join, for the many-to-one
+    # check and as the final sort key (ties keep Understat order, as the stable pandas sort did)
+    under_t = pa.Table.from_pandas(
+        under.assign(team_code=under_code, under_row=np.arange(len(under), dtype=np.int32))[keep],
+        preserve_index=False,
+    )
+    matches_t = pa.Table.from_pandas(
+        matches.drop(columns="team_id").assign(team_code=match_code),
+        preserve_index=False,
+    )
+
     # matches was already validated as unique on (season,date,team_id),
     # so this is many-to-one from Understat -> matches.
-    panel = under.merge(
-        matches,
-        on=["season", "date", "team_id"],
-        how="inner",
-        validate="many_to_one",
-    )
+    panel = under_t.join(matches_t, keys=["season", "date", "team_code"], join_type="inner")
+    under_row = panel.column("under_row").to_numpy()
+    if len(under_row) and np.bincount(under_row).max() > 1:
+        raise ValueError("[rotation_panel] Understat rows matched more than one league match (expected many-to-one).")
 
-    after = len(panel)
+    after = panel.num_rows
     dropped = before - after
     if dropped > 0:
         logger.warning(
@@ -212,12 +308,27 @@ def build_rotation_panel(matches: pd.DataFrame, under: pd.DataFrame, logger) ->
             dropped,
         )
 
-    assert_non_empty(panel, "rotation_panel")
-
-    # days_rest per player: days since previous appearance (player-level)
-    panel = panel.sort_values(["player_id", "date"])
-    panel["days_rest"] = panel.groupby("player_id")["date"].diff().dt.days
-    panel["days_rest"] = panel["days_rest"].fillna(30).astype(float).clip(lower=0, upper=30)
+    if after == 0:
+        raise ValueError("[rotation_panel] DataFrame is empty.")
+
+    # days_rest per player: days since previous appearance (player-level), i.e.
+    # date - lag(date) OVER (PARTITION BY player_id ORDER BY date).
+    # Sort on dense player codes + int64 dates (sorted factorize keeps player_id ordering), with
+    # the Understat row as tie-breaker so the join's thread-dependent output order never reaches
+    # the panel; then take neighbour differences on the sorted arrays. A player's first row
+    # (where the code changes) gets the 30-day default instead of a cross-player difference.
+    # Rows without a player_id share one code (sorted last, as sort_values puts NaN) but are not
+    # one player: groupby drops them, so they all get the default too.
+    player_id = panel.column("player_id")
+    codes, _ = pd.factorize(player_id.to_pandas(), sort=True, use_na_sentinel=False)
+    days = panel.column("date").to_numpy().astype("datetime64[D]").view("int64")
+    order = np.lexsort((under_row, days, codes))
+    days, codes = days[order], codes[order]
+    days_rest = np.full(len(days), 30, dtype=np.float32)
+    days_rest[1:] = days[1:] - days[:-1]
+    days_rest[1:][codes[1:] != codes[:-1]] = 30
+    days_rest[player_id.is_null().to_numpy(zero_copy_only=False)[order]] = 30
+    np.clip(days_rest, 0, 30, out=days_rest)
 
     # Final schema / stable column order
     cols = [
@@ -234,7 +345,7 @@ def build_rotation_panel(matches: pd.DataFrame, under: pd.DataFrame, logger) ->
         "started",
         "days_rest",
     ]
-    panel = panel[cols].copy()
+    panel = panel.take(order).append_column("days_rest", pa.array(days_rest)).select(cols)
 
     logger.info("Rotation panel built: shape=%s", panel.shape)
     return panel
@@ -251,6 +362,7 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--out-csv", type=str, default=None, help="Override output CSV path")
     p.add_argument("--out-parquet", type=str, default=None, help="Override output parquet path")
     p.add_argument("--dry-run", action="store_true", help="Run full build/validation but do not write outputs")
+    p.add_argument("--force", action="store_true", help="Rebuild even if inputs are unchanged since the last build")
     return p.parse_args()
 
 
@@ -278,6 +390,25 @@ def main() -> None:
     logger.info("Writing CSV to:         %s", out_csv)
     logger.info("Writing parquet to:     %s", out_parquet)
 
+    # Skip the rebuild if the existing outputs were built from these exact inputs, code and output
+    # paths, and the CSV is still the one written alongside the parquet (its size/mtime are
+    # stored in the parquet footer as csv_key)
+    src_key = None
+    if matches_path.exists() and under_path.exists():
+        src_key = source_key(
+            [matches_path, under_path, *_CODE_FILES], extra=f"{out_csv.resolve()}|{out_parquet.resolve()}"
+        )
+    if (
+        src_key is not None
+        and not (args.dry_run or args.force)
+        and out_csv.exists()
+        and read_source_key(out_parquet) == src_key
+        and read_source_key(out_parquet, "csv_key") == source_key([out_csv])
+    ):
+        logger.info("Inputs unchanged since last build (src_key=%s); skipping rebuild.", src_key)
+        print(f"✅ rotation panel up to date (inputs unchanged) | {out_parquet}")
+        return
+
     matches = load_matches(matches_path, logger)
     under = load_understat_minutes(under_path, logger)
     panel = build_rotation_panel(matches, under, logger)
@@ -287,14 +418,20 @@ def main() -> None:
         print(f"✅ dry-run complete | panel shape: {panel.shape} | output NOT written")
         return
 
-    # Ensure output dir exists and write CSV (required output)
+    # Ensure output dir exists and write CSV (required output). The CSV writer formats from
+    # pandas, so this is the run's one to_pandas; the parquet write takes the Arrow table.
     out_csv.parent.mkdir(parents=True, exist_ok=True)
-    atomic_write_csv(panel, out_csv, index=False)
+    atomic_write_csv(panel.to_pandas(), out_csv)
+
+    # The parquet footer records the build key and the CSV just written, so the next run
+    # only skips if both outputs are still this build's
+    if src_key is not None:
+        panel = with_source_key(with_source_key(panel, src_key), source_key([out_csv]), name="csv_key")
 
     # Parquet is optional (environment-dependent)
     try:
         out_parquet.parent.mkdir(parents=True, exist_ok=True)
-        panel.to_parquet(out_parquet, index=False)
+        atomic_write_parquet(panel, out_parquet)
         parquet_status = "written"
     except Exception as e:
         parquet_status = f"skipped ({type(e).__name__}: {e})"
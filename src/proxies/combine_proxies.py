@@ -11,6 +11,11 @@ Inputs (defaults):
 
 Output (default):
 - results/proxies_combined.csv
+- results/proxies_combined.parquet   (optional; skipped on write failure)
+
+I/O:
+- If an input CSV has a .parquet sibling written from its current contents (by the proxy scripts),
+  that is read instead; otherwise the CSV is parsed with Arrow's multi-threaded reader.
 
 Robustness:
 - Injury proxy may store Understat numeric IDs as either:
@@ -22,12 +27,16 @@ Robustness:
 from __future__ import annotations
 from pathlib import Path
 import argparse
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from src.utils.config import Config
-from src.utils.io import atomic_write_csv
+from src.utils.io import atomic_write_csv, parquet_sibling, read_csv_arrow, read_csv_header, write_parquet_sibling
 from src.utils.logging_setup import setup_logger
 from src.utils.run_metadata import write_run_metadata
+from src.utils.text import clean_str
 from src.validation.checks import assert_non_empty, require_columns
 
 
@@ -39,6 +48,18 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--rotation", type=str, default=None, help="Path to proxy1_rotation_elasticity.csv")
     p.add_argument("--injury", type=str, default=None, help="Path to proxy2_injury_final_named.csv")
     p.add_argument("--out", type=str, default=None, help="Output path for proxies_combined.csv")
+    p.add_argument(
+        "--merge-engine",
+        choices=["arrow", "pandas"],
+        default="arrow",
+        help="Outer-join implementation: Arrow hash join (default) or the pandas index join",
+    )
+    p.add_argument(
+        "--sorted",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Sort the output by season/team/player (default); --no-sorted keeps join order for batch runs",
+    )
     p.add_argument("--dry-run", action="store_true", help="Run full load/merge/validation but do not write output")
     return p.parse_args()
 
@@ -47,29 +68,88 @@ def parse_args() -> argparse.Namespace:
 # Loaders
 # ---------------------------------------------------------------------
 def _normalize_cols(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    # Renames in place: callers pass the frame they just read
     df.columns = [c.strip() for c in df.columns]
     return df
 
 
+# Arrow types for the merge keys when parsing CSV inputs (skips type inference; season fits int16).
+# Injury player ids are left to inference: legacy files may store them as floats or names.
+_ROT_TYPES = {"player_id": pa.int32(), "season": pa.int16(), "team_id": pa.string(), "player_name": pa.string()}
+_INJ_TYPES = {"season": pa.int16(), "Season": pa.int16(), "team_id": pa.string(), "Team": pa.string(), "player_name": pa.string()}
+
+
+# Columns carried into the combined output (kept if present, in this order)
+ROT_KEEP = [
+    "player_id",
+    "player_name",
+    "team_id",
+    "season",
+    "n_matches",
+    "n_starts",
+    "start_rate_all",
+    "start_rate_hard",
+    "start_rate_easy",
+    "rotation_elasticity",
+]
+INJ_KEEP = [
+    "player_id",
+    "player_name",
+    "team_id",
+    "season",
+    "beta_unavailable",
+    "xpts_per_match_present",
+    "xpts_season_total",
+    "value_gbp_season_total",
+]
+# Legacy injury column names that load_injury renames to the INJ_KEEP keys
+_INJ_ALIASES = ["understat_player_id", "Team", "Season"]
+
+
+def _read_proxy(path: Path, column_types: dict[str, pa.DataType], columns: list[str]) -> pd.DataFrame:
+    """
+    Read a proxy output, preferring its parquet sibling while that was written from the CSV's current contents.
+
+    Only `columns` are read (matched after stripping whitespace from the file's names), so the
+    unused result columns are never parsed or materialised.
+    """
+    wanted = set(columns)
+    pq_path = parquet_sibling(path)
+    if pq_path is not None:
+        try:
+            names = pq.read_schema(pq_path).names
+            return pd.read_parquet(pq_path, engine="pyarrow", columns=[n for n in names if n.strip() in wanted])
+        except Exception:
+            pass
+    header = read_csv_header(path)
+    return read_csv_arrow(path, columns=[n for n in header if n.strip() in wanted], column_types=column_types)
+
+
+def _to_nullable_int(s: pd.Series, dtype: str) -> pd.Series:
+    """Cast a key column to a nullable integer dtype; only non-integer input is coerced via pd.to_numeric."""
+    if not pd.api.types.is_integer_dtype(s):
+        s = pd.to_numeric(s, errors="coerce")
+    return s.astype(dtype)
+
+
 def load_rotation(path: Path) -> pd.DataFrame:
-    rot = pd.read_csv(path)
+    rot = _read_proxy(path, _ROT_TYPES, ROT_KEEP)
     rot = _normalize_cols(rot)
 
     # Required merge keys
     require_columns(rot, ["player_id", "team_id", "season"], "rotation_proxy")
 
-    rot["player_id"] = pd.to_numeric(rot["player_id"], errors="coerce").astype("Int64")
-    rot["season"] = pd.to_numeric(rot["season"], errors="coerce").astype("Int64")
-    rot["team_id"] = rot["team_id"].astype(str).str.strip()
+    rot["player_id"] = _to_nullable_int(rot["player_id"], "Int32")
+    rot["season"] = _to_nullable_int(rot["season"], "Int16")
+    rot["team_id"] = clean_str(rot["team_id"])
     if "player_name" in rot.columns:
-        rot["player_name"] = rot["player_name"].astype(str).str.strip()
+        rot["player_name"] = clean_str(rot["player_name"])
 
     return rot
 
 
 def load_injury(path: Path) -> pd.DataFrame:
-    inj = pd.read_csv(path)
+    inj = _read_proxy(path, _INJ_TYPES, INJ_KEEP + _INJ_ALIASES)
     inj = _normalize_cols(inj)
 
     # Accept common variants and standardise to: player_id, team_id, season
@@ -95,12 +175,12 @@ def load_injury(path: Path) -> pd.DataFrame:
 
     require_columns(inj, ["player_id", "team_id", "season"], "injury_proxy")
 
-    inj["player_id"] = pd.to_numeric(inj["player_id"], errors="coerce").astype("Int64")
-    inj["season"] = pd.to_numeric(inj["season"], errors="coerce").astype("Int64")
-    inj["team_id"] = inj["team_id"].astype(str).str.strip()
+    inj["player_id"] = _to_nullable_int(inj["player_id"], "Int32")
+    inj["season"] = _to_nullable_int(inj["season"], "Int16")
+    inj["team_id"] = clean_str(inj["team_id"])
 
     if "player_name" in inj.columns:
-        inj["player_name"] = inj["player_name"].astype(str).str.strip()
+        inj["player_name"] = clean_str(inj["player_name"])
 
     return inj
 
@@ -113,13 +193,73 @@ def _assert_no_duplicate_keys(df: pd.DataFrame, keys: list[str], name: str) -> N
     - Duplicate keys cause many-to-many merges and silently inflate row counts.
     """
     require_columns(df, keys, name=name)
-    df_nn = df.dropna(subset=keys)
-    dup = int(df_nn.duplicated(keys).sum())
-    if dup > 0:
-        example = df_nn.loc[df_nn.duplicated(keys, keep=False), keys].head(10)
+    # Fast path for the common (clean) case: one uint64 hash per complete key row, and a
+    # sort + neighbour compare instead of building a group index
+    complete = df[keys].notna().all(axis=1).to_numpy()
+    hashes = np.sort(pd.util.hash_pandas_object(df.loc[complete, keys], index=False).to_numpy())
+    if not (hashes[1:] == hashes[:-1]).any():
+        return
+
+    # Possible duplicate (or a hash collision): count exactly. groupby drops missing keys itself
+    # and yields the offending keys directly.
+    counts = df.groupby(keys, sort=False, observed=True).size()
+    dup_keys = counts[counts > 1]
+    if len(dup_keys):
+        dup = int((dup_keys - 1).sum())
+        example = dup_keys.rename("n_rows").head(10).reset_index()
         raise ValueError(f"[{name}] Found {dup} duplicate rows on keys={keys}. Example:\n{example}")
 
 
+# ---------------------------------------------------------------------
+# Merge
+# ---------------------------------------------------------------------
+# Stand-in for a missing player_id or season inside the Arrow join (both are positive)
+_NULL_ID = -1
+
+
+def _outer_join_pandas(rot: pd.DataFrame, inj: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """Outer join as an index-on-index join on the key MultiIndex (sort=False; sorted once later)."""
+    return (
+        rot.set_index(keys)
+        .join(inj.set_index(keys), how="outer", lsuffix="_rot", rsuffix="_inj", sort=False)
+        .reset_index()
+    )
+
+
+def _outer_join_arrow(rot: pd.DataFrame, inj: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """
+    Outer join in Arrow's multi-threaded hash-join engine.
+
+    Notes:
+    - team_id joins on its categorical codes (Arrow cannot join on dictionary columns) and is
+      mapped back to the team names afterwards.
+    - pandas matches missing keys to each other, Arrow never does: missing player_ids and
+      seasons are joined as _NULL_ID and restored to <NA> afterwards, so both engines return
+      the same rows. (team_id is never missing: clean_str turns nulls into 'nan'.)
+    """
+    null_season = rot["season"].isna().any() or inj["season"].isna().any()
+
+    def to_arrow(df: pd.DataFrame) -> pa.Table:
+        df = df.assign(
+            player_id=df["player_id"].fillna(_NULL_ID).astype("int32"),
+            season=df["season"].fillna(_NULL_ID).astype("int16"),
+            team_id=df["team_id"].cat.codes,
+        )
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    table = to_arrow(rot).join(
+        to_arrow(inj), keys=keys, join_type="full outer", left_suffix="_rot", right_suffix="_inj"
+    )
+    combined = table.to_pandas(types_mapper={pa.int32(): pd.Int32Dtype()}.get)
+    combined["player_id"] = combined["player_id"].mask(combined["player_id"] == _NULL_ID)
+    if null_season:
+        # Nullable again, as the season column on the pandas path
+        season = combined["season"].astype("Int16")
+        combined["season"] = season.mask(season == _NULL_ID)
+    combined["team_id"] = pd.Categorical.from_codes(combined["team_id"].to_numpy(), dtype=rot["team_id"].dtype)
+    return combined
+
+
 # ---------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------
@@ -159,71 +299,75 @@ def main() -> None:
     _assert_no_duplicate_keys(inj, ["player_id", "season", "team_id"], "injury_proxy")
 
     # Keep a stable subset of columns (but don’t crash if some are missing)
-    rot_keep = [
-        "player_id",
-        "player_name",
-        "team_id",
-        "season",
-        "n_matches",
-        "n_starts",
-        "start_rate_all",
-        "start_rate_hard",
-        "start_rate_easy",
-        "rotation_elasticity",
-    ]
-    rot_keep = [c for c in rot_keep if c in rot.columns]
-    rot = rot[rot_keep].copy()
-
-    inj_keep = [
-        "player_id",
-        "player_name",
-        "team_id",
-        "season",
-        "beta_unavailable",
-        "xpts_per_match_present",
-        "xpts_season_total",
-        "value_gbp_season_total",
+    rot_keep = [c for c in ROT_KEEP if c in rot.columns]
+    rot = rot.loc[:, rot_keep]
+
+    inj_keep = [c for c in INJ_KEEP if c in inj.columns]
+    inj = inj.loc[:, inj_keep]
+
+    # Merge on compact keys: team_id as a categorical over the teams of both sides (the hash join
+    # then works on integer codes, not strings) and season as int16 when it has no missing values
+    # (otherwise it stays nullable Int16, as does player_id's Int32: unmatched injury rows have none).
+    teams = pd.CategoricalDtype(sorted(set(rot["team_id"]).union(inj["team_id"])))
+    for df in (rot, inj):
+        df["team_id"] = df["team_id"].astype(teams)
+        if df["season"].notna().all():
+            df["season"] = df["season"].astype("int16")
+
+    # Outer join to keep unmatched rows (coverage differs)
+    keys = ["player_id", "season", "team_id"]
+    outer_join = _outer_join_arrow if args.merge_engine == "arrow" else _outer_join_pandas
+    combined = outer_join(rot, inj, keys)
+    # Restore merge()'s column layout: rot columns in place, then inj's non-key columns
+    overlap = (set(rot.columns) & set(inj.columns)) - set(keys)
+    combined = combined[
+        [f"{c}_rot" if c in overlap else c for c in rot.columns]
+        + [f"{c}_inj" if c in overlap else c for c in inj.columns if c not in keys]
     ]
-    inj_keep = [c for c in inj_keep if c in inj.columns]
-    inj = inj[inj_keep].copy()
-
-    # Outer merge to keep unmatched rows (coverage differs)
-    combined = rot.merge(
-        inj,
-        on=["player_id", "season", "team_id"],
-        how="outer",
-        suffixes=("_rot", "_inj"),
-    )
     assert_non_empty(combined, "combined_proxies")
 
+    # Column set is checked once here and refreshed only where the schema changes
+    cols = frozenset(combined.columns)
+
     # Consolidate player_name if both sides present
-    if "player_name_rot" in combined.columns and "player_name_inj" in combined.columns:
-        combined["player_name"] = combined["player_name_rot"].fillna(combined["player_name_inj"])
-        combined = combined.drop(columns=["player_name_rot", "player_name_inj"])
-    elif "player_name_rot" in combined.columns:
-        combined = combined.rename(columns={"player_name_rot": "player_name"})
-    elif "player_name_inj" in combined.columns:
-        combined = combined.rename(columns={"player_name_inj": "player_name"})
+    if "player_name_rot" in cols and "player_name_inj" in cols:
+        rot_name = combined.pop("player_name_rot").to_numpy()
+        inj_name = combined.pop("player_name_inj").to_numpy()
+        combined["player_name"] = np.where(pd.isna(rot_name), inj_name, rot_name)
+    else:
+        # At most one side carries a name: rename it in place (absent labels are ignored)
+        combined.rename(columns={"player_name_rot": "player_name", "player_name_inj": "player_name"}, inplace=True)
+    cols = frozenset(combined.columns)
 
     # Coverage flags
-    combined["has_rotation"] = combined["rotation_elasticity"].notna() if "rotation_elasticity" in combined.columns else False
-    combined["has_injury"] = combined["xpts_season_total"].notna() if "xpts_season_total" in combined.columns else False
-
-    # Convenience alias used elsewhere
-    if "xpts_season_total" in combined.columns and "inj_xpts" not in combined.columns:
-        combined["inj_xpts"] = combined["xpts_season_total"]
+    # (float columns: NaN test on the raw float64 arrays). These flag an *estimate*, not just a
+    # row from that side: a rotation/injury row whose estimate is missing counts as not covered,
+    # which a join indicator (left_only/both) would not capture.
+    has_rotation = (
+        ~np.isnan(combined["rotation_elasticity"].to_numpy(dtype="float64", na_value=np.nan))
+        if "rotation_elasticity" in cols else np.zeros(len(combined), dtype=bool)
+    )
+    has_injury = (
+        ~np.isnan(combined["xpts_season_total"].to_numpy(dtype="float64", na_value=np.nan))
+        if "xpts_season_total" in cols else np.zeros(len(combined), dtype=bool)
+    )
+    combined["has_rotation"] = has_rotation
+    combined["has_injury"] = has_injury
 
-    # Stable sort for deterministic output
-    sort_cols = [c for c in ["season", "team_id", "player_name", "player_id"] if c in combined.columns]
-    if sort_cols:
-        combined = combined.sort_values(sort_cols).reset_index(drop=True)
+    # Stable sort for deterministic output (in place; ignore_index replaces the reset_index copy).
+    # team_id is still categorical here with sorted categories, so it sorts on its integer codes.
+    sort_cols = [c for c in ["season", "team_id", "player_name", "player_id"] if c in cols]
+    if args.sorted and sort_cols:
+        combined.sort_values(sort_cols, kind="mergesort", inplace=True, ignore_index=True)
+    combined["team_id"] = combined["team_id"].astype(str)
 
+    # Flag counts come from the arrays above (sorting does not change them)
     logger.info(
         "Combined shape=%s | has_rotation=%d | has_injury=%d | both=%d",
         combined.shape,
-        int(combined["has_rotation"].sum()) if "has_rotation" in combined.columns else 0,
-        int(combined["has_injury"].sum()) if "has_injury" in combined.columns else 0,
-        int((combined["has_rotation"] & combined["has_injury"]).sum()) if {"has_rotation", "has_injury"}.issubset(combined.columns) else 0,
+        int(has_rotation.sum()),
+        int(has_injury.sum()),
+        int((has_rotation & has_injury).sum()),
     )
 
     if args.dry_run:
@@ -231,11 +375,19 @@ def main() -> None:
         print(combined.head(10).to_string(index=False))
         return
 
+    # inj_xpts: convenience alias of xpts_season_total used by the analysis scripts
+    if "xpts_season_total" in cols and "inj_xpts" not in cols:
+        combined["inj_xpts"] = combined["xpts_season_total"]
+
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    atomic_write_csv(combined, out_path, index=False)
+    atomic_write_csv(combined, out_path)
+    try:
+        write_parquet_sibling(combined, out_path)
+    except Exception as e:
+        logger.warning("Parquet write skipped: %s", e)
 
     print(f"✅ Saved combined proxies to {out_path}")
-    print(f"Rows: {len(combined)} | Distinct teams: {combined['team_id'].nunique() if 'team_id' in combined.columns else 'NA'}")
+    print(f"Rows: {len(combined)} | Distinct teams: {combined['team_id'].nunique()}")
 
 
 if __name__ == "__main__":
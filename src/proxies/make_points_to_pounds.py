@@ -10,11 +10,19 @@ Then create a linear mapping:
 
 Outputs (default):
   <cfg.processed>/points_to_pounds/points_to_pounds_<season>.csv
+  With --format parquet|both: one Season-partitioned parquet dataset,
+  <cfg.processed>/points_to_pounds/points_to_pounds.parquet/Season=<season>/...
+  (read a season with pd.read_parquet(path, filters=[("Season", "=", season)])).
 
 Inputs (defaults):
   - <cfg.processed>/standings/standings_*.csv
   - <cfg.raw>/pl_prize_money.csv
 
+Cache:
+  <cfg.processed>/.cache/points_to_pounds_{standings,prize}.parquet hold the parsed inputs,
+  keyed on the input files' size/mtime (and this script); re-runs on unchanged inputs skip the
+  CSV parsing. Use --no-cache to always re-read the CSVs.
+
 Notes:
 - This is an approximation intended for interpretability (points → money scale).
 - If the merge produces fewer rows than expected, it usually indicates team-name
@@ -26,10 +34,51 @@ Notes:
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
 from pathlib import Path
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as pads
+import pyarrow.parquet as pq
 
+from src.utils import io as io_utils
+from src.utils import text as text_utils
 from src.utils.config import Config
+from src.utils.io import (
+    atomic_write_csv,
+    atomic_write_parquet,
+    read_csv_header,
+    read_source_key,
+    scan_csv_dataset,
+    source_key,
+    with_source_key,
+)
+from src.utils.text import clean_str
+
+# Only these standings columns are used; the team column goes by several names.
+_STANDINGS_COLS = frozenset({"Season", "Team", "HomeTeam", "Club", "Pts"})
+_PRIZE_COLS = frozenset({"Season", "Team", "pl_total_gbp"})
+
+# pandas fallback / prize reads: labels parsed as strings and numbers as float64, no inference
+_STANDINGS_DTYPES = {"Season": str, "Team": str, "HomeTeam": str, "Club": str, "Pts": "float64"}
+_PRIZE_DTYPES = {"Season": str, "Team": str, "pl_total_gbp": "float64"}
+
+# Same types for the Arrow scan; empty label cells become nulls, as with read_csv
+_STANDINGS_FORMAT = pads.CsvFileFormat(
+    convert_options=pacsv.ConvertOptions(
+        column_types={
+            "Season": pa.string(),
+            "Team": pa.string(),
+            "HomeTeam": pa.string(),
+            "Club": pa.string(),
+            "Pts": pa.float64(),
+        },
+        strings_can_be_null=True,
+    )
+)
 
 
 def _standardise_standings_schema(df: pd.DataFrame) -> pd.DataFrame:
@@ -61,33 +110,102 @@ def _standardise_standings_schema(df: pd.DataFrame) -> pd.DataFrame:
         raise ValueError(f"[standings] Missing 'Pts'. Columns: {list(df.columns)}")
 
     # Basic cleaning
-    df["Season"] = df["Season"].astype(str).str.strip()
-    df["Team"] = df["Team"].astype(str).str.strip()
+    df["Season"] = clean_str(df["Season"])
+    df["Team"] = clean_str(df["Team"])
     df["Pts"] = pd.to_numeric(df["Pts"], errors="coerce")
 
     return df
 
 
+def _standings_paths(standings_dir: Path) -> list[Path]:
+    """Per-season standings files (the combined all_seasons file is skipped)."""
+    return [p for p in sorted(standings_dir.glob("standings_*.csv")) if "all_seasons" not in p.name]
+
+
 def load_standings(standings_dir: Path) -> pd.DataFrame:
     """Load all per-season standings_*.csv into one DataFrame (standardised to Season/Team/Pts)."""
-    frames: list[pd.DataFrame] = []
+    paths = _standings_paths(standings_dir)
 
-    for path in sorted(standings_dir.glob("standings_*.csv")):
-        if "all_seasons" in path.name:
-            continue
-        frames.append(pd.read_csv(path))
-
-    if not frames:
+    if not paths:
         raise FileNotFoundError(
             f"No per-season standings_*.csv files found in {standings_dir}. "
             "If your standings are stored elsewhere, pass --standings-dir."
         )
 
-    standings = pd.concat(frames, ignore_index=True)
+    # Per-season files normally share one layout: read them in a single dataset scan (one parse
+    # pass, no per-file concat). Files with differing team-column names or types are read one by one.
+    columns = [c for c in read_csv_header(paths[0]) if c.strip() in _STANDINGS_COLS]
+    table = scan_csv_dataset(paths, _STANDINGS_FORMAT, columns=columns)
+    standings = table.to_pandas() if table is not None else None
+    if standings is None:
+        frames = [
+            pd.read_csv(p, usecols=lambda c: c.strip() in _STANDINGS_COLS, dtype=_STANDINGS_DTYPES, engine="c")
+            for p in paths
+        ]
+        standings = pd.concat(frames, ignore_index=True)
+
     standings = _standardise_standings_schema(standings)
     return standings
 
 
+def load_prize(prize_file: Path) -> pd.DataFrame:
+    """Load pl_prize_money.csv (Season/Team/pl_total_gbp, cleaned)."""
+    if not prize_file.exists():
+        raise FileNotFoundError(f"Prize money file not found: {prize_file}")
+
+    prize = pd.read_csv(prize_file, usecols=lambda c: c.strip() in _PRIZE_COLS, dtype=_PRIZE_DTYPES, engine="c")
+    prize.columns = [c.strip() for c in prize.columns]
+
+    required_cols = {"Season", "Team", "pl_total_gbp"}
+    missing = required_cols - set(prize.columns)
+    if missing:
+        raise ValueError(
+            f"[pl_prize_money.csv] Missing columns: {sorted(missing)}. "
+            f"Needs: {sorted(required_cols)}"
+        )
+
+    prize["Season"] = clean_str(prize["Season"])
+    prize["Team"] = clean_str(prize["Team"])
+    return prize.loc[:, ["Season", "Team", "pl_total_gbp"]]
+
+
+# ----------------------------
+# Parsed-input cache
+# ----------------------------
+# Code the parsed inputs depend on: editing any of these invalidates the cache
+_CODE_FILES = [Path(__file__), Path(io_utils.__file__), Path(text_utils.__file__)]
+
+
+def _load_cached(cache_path: Path | None, inputs: list[Path], load: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Return load()'s result, served from cache_path when it was built from the same inputs.
+
+    A missing input (or cache_path=None) bypasses the cache, so load() reports the error as usual.
+    Failing to write the cache only costs the speed-up on the next run.
+    """
+    if cache_path is None or not inputs or not all(p.exists() for p in inputs):
+        return load()
+
+    key = source_key([*inputs, *_CODE_FILES])
+    if read_source_key(cache_path) == key:
+        print(f"[cache] Using {cache_path}")
+        return pd.read_parquet(cache_path)
+
+    df = load()
+    try:
+        atomic_write_parquet(with_source_key(pa.Table.from_pandas(df, preserve_index=False), key), cache_path)
+    except Exception as e:
+        print(f"[WARN] Could not write cache {cache_path}: {e}")
+    return df
+
+
+def _write_mapping(item: tuple[Path, pd.DataFrame]) -> Path:
+    """Write one season's points-to-pounds mapping CSV and return its path."""
+    out_path, mapping = item
+    atomic_write_csv(mapping, out_path)
+    return out_path
+
+
 def parse_args(cfg: Config) -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Build points-to-pounds mapping from standings + prize money.")
     p.add_argument(
@@ -108,6 +226,19 @@ def parse_args(cfg: Config) -> argparse.Namespace:
         default=cfg.processed / "points_to_pounds",
         help="Output directory (default: <cfg.processed>/points_to_pounds)",
     )
+    p.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=cfg.processed / ".cache",
+        help="Directory for the parsed-input cache (default: <cfg.processed>/.cache)",
+    )
+    p.add_argument("--no-cache", action="store_true", help="Always re-read the input CSVs (skip the cache)")
+    p.add_argument(
+        "--format",
+        choices=["csv", "parquet", "both"],
+        default="csv",
+        help="Per-season CSVs (default; read by the DiD points script), one partitioned parquet dataset, or both",
+    )
     p.add_argument("--dry-run", action="store_true", help="Compute but do not write outputs")
     return p.parse_args()
 
@@ -118,32 +249,26 @@ def main() -> None:
 
     args.out_dir.mkdir(parents=True, exist_ok=True)
 
-    standings = load_standings(args.standings_dir)
-
-    if not args.prize_file.exists():
-        raise FileNotFoundError(f"Prize money file not found: {args.prize_file}")
-
-    prize = pd.read_csv(args.prize_file)
-    prize.columns = [c.strip() for c in prize.columns]
-
-    required_cols = {"Season", "Team", "pl_total_gbp"}
-    missing = required_cols - set(prize.columns)
-    if missing:
-        raise ValueError(
-            f"[pl_prize_money.csv] Missing columns: {sorted(missing)}. "
-            f"Needs: {sorted(required_cols)}"
-        )
+    use_cache = not args.no_cache
+    standings = _load_cached(
+        args.cache_dir / "points_to_pounds_standings.parquet" if use_cache else None,
+        _standings_paths(args.standings_dir),
+        lambda: load_standings(args.standings_dir),
+    )
+    prize = _load_cached(
+        args.cache_dir / "points_to_pounds_prize.parquet" if use_cache else None,
+        [args.prize_file],
+        lambda: load_prize(args.prize_file),
+    )
 
-    prize["Season"] = prize["Season"].astype(str).str.strip()
-    prize["Team"] = prize["Team"].astype(str).str.strip()
-    prize["pl_total_gbp"] = pd.to_numeric(prize["pl_total_gbp"], errors="coerce")
+    # Shared categories so the merge (and the season groupby) compare integer codes
+    for col in ("Season", "Team"):
+        cats = pd.CategoricalDtype(sorted(set(standings[col]).union(prize[col])))
+        standings[col] = standings[col].astype(cats)
+        prize[col] = prize[col].astype(cats)
 
     # Merge prize money onto standings
-    df = standings.merge(
-        prize[["Season", "Team", "pl_total_gbp"]],
-        on=["Season", "Team"],
-        how="inner",
-    )
+    df = standings.merge(prize, on=["Season", "Team"], how="inner")
 
     if df.empty:
         raise ValueError(
@@ -159,39 +284,77 @@ def main() -> None:
 
     df = df.rename(columns={"pl_total_gbp": "money_gbp"})
 
-    written = 0
-    for season, df_season in df.groupby("Season"):
-        total_money = df_season["money_gbp"].sum()
-        total_points = df_season["Pts"].sum()
-
+    # All per-season reductions in one groupby pass
+    per_season = df.groupby("Season", observed=True).agg(
+        total_money=("money_gbp", "sum"),
+        total_points=("Pts", "sum"),
+        min_pts=("Pts", "min"),
+        max_pts=("Pts", "max"),
+    )
+    per_season["pounds_per_point"] = per_season["total_money"] / per_season["total_points"]
+
+    write_csv = args.format in ("csv", "both")
+    write_parquet = args.format in ("parquet", "both")
+    dataset_path = args.out_dir / "points_to_pounds.parquet"
+
+    pending: list[tuple[Path, pd.DataFrame]] = []
+    for season, total_points, min_pts, max_pts, pounds_per_point in zip(
+        per_season.index,
+        per_season["total_points"],
+        per_season["min_pts"],
+        per_season["max_pts"],
+        per_season["pounds_per_point"],
+    ):
         if pd.isna(total_points) or total_points == 0:
             print(f"[WARN] Skipping {season}: total_points is invalid ({total_points})")
             continue
 
-        pounds_per_point = float(total_money / total_points)
+        pounds_per_point = float(pounds_per_point)
         print(f"{season}: value per point ≈ £{pounds_per_point:,.0f}")
 
-        min_pts = int(df_season["Pts"].min())
-        max_pts = int(df_season["Pts"].max())
+        min_pts = int(min_pts)
+        max_pts = int(max_pts)
 
+        pts = np.arange(min_pts, max_pts + 1, dtype=np.int32)
         mapping = pd.DataFrame(
-            {"Season": [season] * (max_pts - min_pts + 1), "Points": list(range(min_pts, max_pts + 1))}
+            {
+                "Season": str(season),
+                "Points": pts,
+                "Money_gbp": pts.astype(np.float64) * pounds_per_point,
+            }
         )
-        mapping["Money_gbp"] = mapping["Points"] * pounds_per_point
 
         out_path = args.out_dir / f"points_to_pounds_{season}.csv"
 
         if args.dry_run:
-            print(f"[dry-run] Would write {out_path} (rows={len(mapping)})")
+            target = out_path if write_csv else dataset_path
+            print(f"[dry-run] Would write {season} to {target} (rows={len(mapping)})")
         else:
-            mapping.to_csv(out_path, index=False)
-            print(f"[OK] Saved {out_path}")
-            written += 1
+            pending.append((out_path, mapping))
 
     if args.dry_run:
         print("[OK] dry-run complete | no files written")
-    else:
-        print(f"[OK] wrote {written} season mapping files to {args.out_dir}")
+        return
+
+    # Season files are independent; write them concurrently
+    if write_csv and pending:
+        with ThreadPoolExecutor(max_workers=min(8, len(pending))) as pool:
+            for out_path in pool.map(_write_mapping, pending):
+                print(f"[OK] Saved {out_path}")
+
+    # All seasons in one long table, written once as a dataset partitioned by Season
+    if write_parquet and pending:
+        combined = pd.concat([mapping for _, mapping in pending], ignore_index=True)
+        pq.write_to_dataset(
+            pa.Table.from_pandas(combined, preserve_index=False),
+            dataset_path,
+            partition_cols=["Season"],
+            compression="zstd",
+            existing_data_behavior="delete_matching",
+        )
+        print(f"[OK] Saved {dataset_path} (partitioned by Season)")
+
+    print(f"[OK] wrote {len(pending)} season mappings to {args.out_dir} (format={args.format})")
 
 
 if __name__ == "__main__":
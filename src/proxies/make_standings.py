@@ -7,6 +7,8 @@ Input (default):
 Outputs (default):
   <cfg.processed>/standings/standings_<season>.csv
   <cfg.processed>/standings/standings_all_seasons.csv
+  (--format parquet writes .parquet files instead; --no-per-season writes only the combined file.
+  make_points_to_pounds reads the per-season CSVs, so keep the defaults when it runs next.)
 
 Assumptions:
 - One row per Premier League match in odds_master.csv.
@@ -17,20 +19,46 @@ Assumptions:
 Notes:
 - Standings are computed deterministically from match results only.
 - This is fast and does not require any web scraping.
+- A content hash of odds_master.csv (plus the code it runs, the output directory and flags) is stored
+  in <cfg.processed>/.cache/standings_src_key.json with the size/mtime of every output written;
+  if both still match, the rebuild is skipped (use --force to rebuild anyway).
 """
 
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
 import logging
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 
+from src.utils import io as io_utils
+from src.utils import text as text_utils
 from src.utils.config import Config
+from src.utils.io import atomic_write_csv, atomic_write_parquet, read_csv_arrow, source_key
+from src.utils.text import clean_str
 
 
-def build_standings(df_season: pd.DataFrame, season_label: str) -> pd.DataFrame:
+# The odds master carries dozens of bookmaker columns; only these are needed
+_ODDS_COLS = ["season", "home_team", "away_team", "FTHG", "FTAG", "FTR"]
+_ODDS_TYPES = {"season": pa.string(), "home_team": pa.string(), "away_team": pa.string(), "FTR": pa.string()}
+
+
+def _clean_matches(df: pd.DataFrame) -> pd.DataFrame:
+    """Strip team names and coerce goals to numeric (robust to any parsing issues)."""
+    return df.assign(
+        HomeTeam=clean_str(df["HomeTeam"]),
+        AwayTeam=clean_str(df["AwayTeam"]),
+        FTHG=pd.to_numeric(df["FTHG"], errors="coerce"),
+        FTAG=pd.to_numeric(df["FTAG"], errors="coerce"),
+    )
+
+
+def build_standings(df_season: pd.DataFrame, season_label: str, clean: bool = True) -> pd.DataFrame:
     """
     Compute a final league table for one season.
 
@@ -41,6 +69,9 @@ def build_standings(df_season: pd.DataFrame, season_label: str) -> pd.DataFrame:
           HomeTeam, AwayTeam, FTHG, FTAG, FTR
     season_label:
         e.g. '2019-2020'
+    clean:
+        Strip team names and coerce goals to numeric. main() does this once for all seasons
+        and passes clean=False.
 
     Returns
     -------
@@ -52,62 +83,133 @@ def build_standings(df_season: pd.DataFrame, season_label: str) -> pd.DataFrame:
     if missing:
         raise ValueError(f"Season {season_label}: missing columns {sorted(missing)}")
 
-    df = df_season.copy()
+    if clean:
+        df_season = _clean_matches(df_season)
+
+    # Unparseable goals count as 0, as they did when summed by groupby
+    fthg = np.nan_to_num(df_season["FTHG"].to_numpy(dtype="float64", na_value=np.nan))
+    ftag = np.nan_to_num(df_season["FTAG"].to_numpy(dtype="float64", na_value=np.nan))
+
+    # Result codes, mapped from the FTR strings once: 0 = home win, 1 = draw, 2 = away win
+    # (anything else, e.g. a missing result, is 3 and counts for no column)
+    ftr = df_season["FTR"].to_numpy()
+    ftr_code = np.select([ftr == "H", ftr == "D", ftr == "A"], [0, 1, 2], default=3).astype(np.int8)
+
+    # One row per (team, match) appearance: home rows first, then away rows, with teams coded
+    # against one sorted table. Every per-team total is then a single np.bincount scatter-add
+    # (one O(n) pass in C, no sort, no home/away groupbys or outer join).
+    home, away = df_season["HomeTeam"], df_season["AwayTeam"]
+    if (
+        isinstance(home.dtype, pd.CategoricalDtype)
+        and home.dtype == away.dtype
+        and home.cat.categories.is_monotonic_increasing
+    ):
+        # Shared (sorted) categories from main(): the codes are the team table already
+        teams = home.cat.categories.to_numpy()
+        team_code = np.concatenate([home.cat.codes.to_numpy(), away.cat.codes.to_numpy()]).astype(np.intp)
+    else:
+        teams, team_code = np.unique(np.concatenate([home.to_numpy(), away.to_numpy()]), return_inverse=True)
+    n_teams = len(teams)
+    # Result from each appearance's own side: 0 = win, 1 = draw, 2 = loss (3 = no result)
+    side_result = np.concatenate([ftr_code, np.where(ftr_code < 3, 2 - ftr_code, 3)])
+
+    # Single per-team accumulator over the stacked appearances: W/D/L (and no-result) counts
+    # from one integer bincount over team * 4 + result, and MP is their row sum. Every output
+    # is fixed to int32 right here (goal sums are never missing: unparseable goals counted
+    # as 0), so the table is built in its final dtype with no cast pass afterwards.
+    wdl = np.bincount(team_code * 4 + side_result, minlength=n_teams * 4).reshape(n_teams, 4).astype(np.int32)
+    mp = wdl.sum(axis=1, dtype=np.int32)
+    gf = np.bincount(team_code, weights=np.concatenate([fthg, ftag]), minlength=n_teams).astype(np.int32)
+    ga = np.bincount(team_code, weights=np.concatenate([ftag, fthg]), minlength=n_teams).astype(np.int32)
+
+    # The team column keeps the name "HomeTeam" that the old home/away join produced, so the
+    # written standings files (and their readers) are unchanged. Categories cover every
+    # season, so only teams that played in this one are kept.
+    played = mp > 0
+    table = pd.DataFrame(
+        {
+            "MP": mp,
+            "W": wdl[:, 0],
+            "D": wdl[:, 1],
+            "L": wdl[:, 2],
+            "GF": gf,
+            "GA": ga,
+            "GD": gf - ga,
+            "Pts": 3 * wdl[:, 0] + wdl[:, 1],
+        },
+        index=pd.Index(teams, name="HomeTeam"),
+    )[played]
 
-    # Clean team names
-    df["HomeTeam"] = df["HomeTeam"].astype(str).str.strip()
-    df["AwayTeam"] = df["AwayTeam"].astype(str).str.strip()
+    # Sort by points, then goal difference, then goals for (standard tie-break ordering)
+    table = table.sort_values(by=["Pts", "GD", "GF"], ascending=[False, False, False])
 
-    # Ensure numeric goals (robust to any parsing issues)
-    df["FTHG"] = pd.to_numeric(df["FTHG"], errors="coerce")
-    df["FTAG"] = pd.to_numeric(df["FTAG"], errors="coerce")
+    table = table.reset_index().rename(columns={"index": "Team"})
+    table.insert(0, "Position", range(1, len(table) + 1))
+    table.insert(0, "Season", season_label)
 
-    # Home-side aggregates
-    home = df.groupby("HomeTeam").agg(
-        MP_home=("HomeTeam", "size"),
-        GF_home=("FTHG", "sum"),
-        GA_home=("FTAG", "sum"),
-        W_home=("FTR", lambda s: (s == "H").sum()),
-        D_home=("FTR", lambda s: (s == "D").sum()),
-        L_home=("FTR", lambda s: (s == "A").sum()),
-    )
+    return table
 
-    # Away-side aggregates (away goals are FTAG; away conceded are FTHG)
-    away = df.groupby("AwayTeam").agg(
-        MP_away=("AwayTeam", "size"),
-        GF_away=("FTAG", "sum"),
-        GA_away=("FTHG", "sum"),
-        W_away=("FTR", lambda s: (s == "A").sum()),
-        D_away=("FTR", lambda s: (s == "D").sum()),
-        L_away=("FTR", lambda s: (s == "H").sum()),
-    )
 
-    # Combine home + away stats
-    table = home.join(away, how="outer").fillna(0)
+# ----------------------------
+# Rebuild skipping
+# ----------------------------
+_STAMP_NAME = "standings_src_key.json"
 
-    # Totals
-    table["MP"] = table["MP_home"] + table["MP_away"]
-    table["W"] = table["W_home"] + table["W_away"]
-    table["D"] = table["D_home"] + table["D_away"]
-    table["L"] = table["L_home"] + table["L_away"]
-    table["GF"] = table["GF_home"] + table["GF_away"]
-    table["GA"] = table["GA_home"] + table["GA_away"]
-    table["GD"] = table["GF"] - table["GA"]
-    table["Pts"] = 3 * table["W"] + table["D"]
+# Code the standings depend on: this script plus the reading/cleaning helpers it calls
+_CODE_FILES = [Path(__file__), Path(io_utils.__file__), Path(text_utils.__file__)]
 
-    # Sort by points, then goal difference, then goals for (standard tie-break ordering)
-    table = table.sort_values(by=["Pts", "GD", "GF"], ascending=[False, False, False])
 
-    # Keep final columns and cast to int
-    table = table[["MP", "W", "D", "L", "GF", "GA", "GD", "Pts"]].copy()
-    for c in table.columns:
-        table[c] = pd.to_numeric(table[c], errors="coerce").fillna(0).astype(int)
+def _source_key(odds_master_path: Path, out_dir: Path, args: argparse.Namespace) -> str:
+    """
+    Content hash of odds_master.csv plus the code in _CODE_FILES, the output directory and the
+    flags that change the outputs.
 
-    table = table.reset_index().rename(columns={"index": "Team"})
-    table.insert(0, "Position", range(1, len(table) + 1))
-    table.insert(0, "Season", season_label)
+    Hashes bytes rather than mtimes, so a re-export with identical contents still counts as unchanged.
+    """
+    extra = f"{out_dir.resolve()}|{args.format}|{args.no_per_season}"
+    return source_key([odds_master_path, *_CODE_FILES], extra=extra, content=True)
 
-    return table
+
+def _outputs_up_to_date(stamp_path: Path, out_dir: Path, src_key: str) -> bool:
+    """True if the stamp records src_key and the outputs it lists are unchanged since they were written."""
+    try:
+        stamp = json.loads(stamp_path.read_text())
+        outputs = [out_dir / n for n in stamp.get("outputs") or []]
+        return (
+            stamp.get("src_key") == src_key
+            and bool(outputs)
+            and stamp.get("outputs_key") == source_key(outputs)
+        )
+    except (OSError, ValueError):
+        return False
+
+
+def _write_table(df: pd.DataFrame, out_path: Path) -> None:
+    """
+    Write with the atomic helpers (format from the suffix: .csv or .parquet).
+
+    CSVs are formatted by pandas straight from the DataFrame, so no Arrow table is built for
+    them; parquet goes through from_pandas and keeps the pandas metadata for read_parquet.
+    """
+    if out_path.suffix == ".parquet":
+        atomic_write_parquet(df, out_path)
+    else:
+        atomic_write_csv(df, out_path)
+
+
+def _build_one(
+    season_label: str, df_season: pd.DataFrame, out_path: Path | None, dry_run: bool
+) -> tuple[str, pd.DataFrame, Path | None]:
+    """
+    Build one season's standings and, unless dry_run or out_path is None, write them.
+
+    Module-level so worker processes can run it.
+    """
+    logging.info("Building standings for %s...", season_label)
+    standings = build_standings(df_season, season_label, clean=False)
+    if out_path is not None and not dry_run:
+        _write_table(standings, out_path)
+    return season_label, standings, out_path
 
 
 def parse_args(cfg: Config) -> argparse.Namespace:
@@ -124,6 +226,24 @@ def parse_args(cfg: Config) -> argparse.Namespace:
         default=cfg.processed / "standings",
         help="Output directory for standings CSVs (default: <cfg.processed>/standings)",
     )
+    p.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="Output file format (default: csv; make_points_to_pounds reads the per-season CSVs)",
+    )
+    p.add_argument(
+        "--no-per-season",
+        action="store_true",
+        help="Only write the combined standings_all_seasons file",
+    )
+    p.add_argument("--force", action="store_true", help="Rebuild even if odds_master is unchanged since the last build")
+    p.add_argument(
+        "--n-jobs",
+        type=int,
+        default=1,
+        help="Worker processes for building/writing seasons in parallel (default: 1, sequential)",
+    )
     p.add_argument("--dry-run", action="store_true", help="Compute but do not write outputs")
     return p.parse_args()
 
@@ -141,24 +261,60 @@ def main() -> None:
     if not odds_master_path.exists():
         raise FileNotFoundError(f"odds_master.csv not found: {odds_master_path}")
 
-    df_all = pd.read_csv(odds_master_path)
+    # Skip the rebuild if the existing outputs were built from this exact odds master
+    stamp_path = cfg.processed / ".cache" / _STAMP_NAME
+    src_key = _source_key(odds_master_path, out_dir, args)
+    if not (args.dry_run or args.force) and _outputs_up_to_date(stamp_path, out_dir, src_key):
+        logging.info("odds_master unchanged since last build (src_key=%s); skipping rebuild.", src_key)
+        print(f"[OK] standings up to date (inputs unchanged) | {out_dir}")
+        return
+
+    df_all = read_csv_arrow(odds_master_path, columns=_ODDS_COLS, column_types=_ODDS_TYPES)
 
-    required = {"season", "home_team", "away_team", "FTHG", "FTAG", "FTR"}
+    required = set(_ODDS_COLS)
     missing = required - set(df_all.columns)
     if missing:
         raise ValueError(f"Missing columns in odds_master: {sorted(missing)}")
 
-    all_standings: list[pd.DataFrame] = []
-
-    for season_label, df_season_raw in df_all.groupby("season", dropna=False):
-        season_label = str(season_label)
-        logging.info("Building standings for %s...", season_label)
-
-        # Rename to the HomeTeam/AwayTeam schema used inside build_standings()
-        df_season = df_season_raw.rename(columns={"home_team": "HomeTeam", "away_team": "AwayTeam"}).copy()
-
-        standings = build_standings(df_season, season_label)
+    # Rename to the HomeTeam/AwayTeam schema used inside build_standings() (in place: df_all is
+    # our own fresh read, so no block copy) and clean all seasons in one pass. build_standings
+    # then only reads its season slice, so the slices are not copied either.
+    df_all.rename(columns={"home_team": "HomeTeam", "away_team": "AwayTeam"}, inplace=True)
+    df_all = _clean_matches(df_all)
+
+    # One shared, sorted team dictionary for home and away: each season's standings kernel
+    # then works on the integer codes directly instead of re-factorizing team names
+    teams = pd.CategoricalDtype(sorted(set(df_all["HomeTeam"]).union(df_all["AwayTeam"])))
+    df_all["HomeTeam"] = df_all["HomeTeam"].astype(teams)
+    df_all["AwayTeam"] = df_all["AwayTeam"].astype(teams)
+
+    # Seasons are independent: with --n-jobs > 1 each one is built and written in its own process.
+    # groupby(sort=False) skips sorting the group index; only the handful of season labels are
+    # ordered afterwards (missing label last, as groupby's sort put it), so the combined file is
+    # still in season order.
+    groups = sorted(
+        df_all.groupby("season", sort=False, dropna=False),
+        key=lambda g: (pd.isna(g[0]), str(g[0])),
+    )
+    ext = f".{args.format}"
+    jobs = [
+        (
+            str(season_label),
+            df_season,
+            None if args.no_per_season else out_dir / f"standings_{season_label}{ext}",
+            args.dry_run,
+        )
+        for season_label, df_season in groups
+    ]
+    if args.n_jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.n_jobs, len(jobs))) as ex:
+            # map() keeps season order, so logs and the combined file are deterministic
+            results = list(ex.map(_build_one, *zip(*jobs)))
+    else:
+        results = [_build_one(*job) for job in jobs]
 
+    all_standings: list[pd.DataFrame] = []
+    for season_label, standings, out_path in results:
         # Sanity checks (warnings only)
         n_teams = len(standings)
         mp_vals = standings["MP"].unique().tolist()
@@ -167,12 +323,11 @@ def main() -> None:
         if len(mp_vals) > 1:
             logging.warning("Season %s: teams have different MP values: %s", season_label, mp_vals)
 
-        out_path = out_dir / f"standings_{season_label}.csv"
-        if args.dry_run:
-            logging.info("Dry-run: would write %s (rows=%d)", out_path, len(standings))
-        else:
-            standings.to_csv(out_path, index=False)
-            logging.info("Saved %s", out_path)
+        if out_path is not None:
+            if args.dry_run:
+                logging.info("Dry-run: would write %s (rows=%d)", out_path, len(standings))
+            else:
+                logging.info("Saved %s", out_path)
 
         all_standings.append(standings)
 
@@ -180,16 +335,26 @@ def main() -> None:
         logging.warning("No seasons found in odds_master.")
         return
 
-    combined = pd.concat(all_standings, ignore_index=True)
-    combined_path = out_dir / "standings_all_seasons.csv"
+    # Stack the season tables column by column: one numpy concatenate per column and a single
+    # DataFrame constructor, instead of concat's per-frame block alignment and consolidation
+    combined = pd.DataFrame(
+        {c: np.concatenate([t[c].to_numpy() for t in all_standings]) for c in all_standings[0].columns}
+    )
+    combined_path = out_dir / f"standings_all_seasons{ext}"
 
     if args.dry_run:
         logging.info("Dry-run: combined standings would be written to %s (rows=%d).", combined_path, len(combined))
         print("[OK] dry-run complete | combined shape:", combined.shape)
         return
 
-    combined.to_csv(combined_path, index=False)
+    _write_table(combined, combined_path)
     logging.info("Saved %s", combined_path)
+
+    # Stamp last, so an interrupted run is never mistaken for an up-to-date one
+    outputs = [p for _, _, p in results if p is not None] + [combined_path]
+    stamp = {"src_key": src_key, "outputs": [p.name for p in outputs], "outputs_key": source_key(outputs)}
+    stamp_path.parent.mkdir(parents=True, exist_ok=True)
+    stamp_path.write_text(json.dumps(stamp, indent=2))
     print("[OK] wrote standings | combined shape:", combined.shape)
 
 
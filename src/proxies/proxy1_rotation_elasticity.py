@@ -27,6 +27,7 @@ Input (default):
 
 Output (default):
 - <project_root>/results/proxy1_rotation_elasticity.csv
+- <project_root>/results/proxy1_rotation_elasticity.parquet   (optional; read by combine_proxies)
 
 One row per (player_id, player_name, team_id, season).
 """
@@ -38,11 +39,13 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 
 from src.utils.config import Config
 from src.utils.logging_setup import setup_logger
 from src.utils.run_metadata import write_run_metadata
-from src.utils.io import atomic_write_csv
+from src.utils.io import atomic_write_csv, read_csv_header, write_parquet_sibling
+from src.utils.text import str_categorical
 
 
 # ---------------------------------------------------------------------
@@ -78,25 +81,38 @@ def load_panel_rotation(path: Path) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"Rotation panel not found: {path}")
 
+    # Check the header/schema first, then read only the required columns (projection at the
+    # reader, so the full panel is never materialised and no column-subset copy is needed)
     if path.suffix.lower() == ".parquet":
-        df = pd.read_parquet(path)
+        pf = pq.ParquetFile(path)
+        columns = pf.schema_arrow.names
     elif path.suffix.lower() == ".csv":
-        df = pd.read_csv(path)
+        pf = None
+        columns = read_csv_header(path)
     else:
         raise ValueError(f"Unsupported file type for rotation panel: {path.suffix}")
 
-    missing = [c for c in REQUIRED_COLS if c not in df.columns]
+    missing = [c for c in REQUIRED_COLS if c not in columns]
     if missing:
         raise ValueError(f"Missing columns in panel_rotation: {missing}")
 
+    if pf is not None:
+        # Arrow read straight to numpy-backed columns; a typed timestamp column arrives as
+        # datetime64 and needs no re-parse below
+        out = pf.read(columns=REQUIRED_COLS).to_pandas()
+    else:
+        # usecols keeps file order; restore REQUIRED_COLS order
+        out = pd.read_csv(path, usecols=REQUIRED_COLS).reindex(columns=REQUIRED_COLS)
+
     # Basic typing (keeps subsequent groupby logic stable)
-    out = df[REQUIRED_COLS].copy()
     out["season"] = pd.to_numeric(out["season"], errors="coerce").astype(int)
-    out["player_id"] = out["player_id"].astype(str)
-    out["player_name"] = out["player_name"].astype(str)
-    out["team_id"] = out["team_id"].astype(str)
-    out["opponent_id"] = out["opponent_id"].astype(str)
-    out["date"] = pd.to_datetime(out["date"], errors="coerce")
+    # Few distinct values over many rows: store as categoricals (int codes, sorted string
+    # categories) so groupbys hash codes rather than Python strings. Only the distinct values
+    # are stringified, not every row.
+    for c in ("player_id", "player_name", "team_id", "opponent_id"):
+        out[c] = str_categorical(out[c])
+    if not pd.api.types.is_datetime64_any_dtype(out["date"]):
+        out["date"] = pd.to_datetime(out["date"], errors="coerce", format="ISO8601")
     out["xpts"] = pd.to_numeric(out["xpts"], errors="coerce")
     out["started"] = out["started"].astype(bool)
 
@@ -107,13 +123,79 @@ def load_panel_rotation(path: Path) -> pd.DataFrame:
     return out
 
 
+# ---------------------------------------------------------------------
+# Integer group ids (shared by the tercile and per-player aggregations)
+# ---------------------------------------------------------------------
+
+def _group_ids(df: pd.DataFrame, keys: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Dense group id per row (groups numbered in sorted key order, as groupby(sort=True) does)
+    and one row index per group, for reading back that group's key values.
+
+    Each key is factorized on its own (categoricals factorize on their codes), the per-key
+    codes are packed into one int64 with ravel_multi_index, and that integer key is
+    factorized again: a hash pass over int64s, with only the distinct keys sorted.
+    Falls back to groupby.ngroup if the combined key space does not fit an int64.
+
+    The key columns must be non-null (load_panel stringifies missing ids to 'nan'): a missing
+    key would get code -1 here and group id -1 from ngroup, so it raises instead.
+    """
+    codes, dims = [], []
+    for k in keys:
+        c, uniques = pd.factorize(df[k], sort=True)
+        if (c < 0).any():
+            raise ValueError(f"Group key {k!r} has {int((c < 0).sum())} missing values")
+        codes.append(c)
+        dims.append(max(len(uniques), 1))
+    try:
+        flat = np.ravel_multi_index(codes, dims)
+    except ValueError:
+        gid = df.groupby(keys, sort=True, observed=True).ngroup().to_numpy()
+        return gid, np.unique(gid, return_index=True)[1]
+    gid, uniques = pd.factorize(flat, sort=True)
+    # Any row of a group carries its key values, so a plain scatter is enough
+    rep = np.empty(len(uniques), dtype=np.intp)
+    rep[gid] = np.arange(len(gid))
+    return gid, rep
+
+
+def _group_quantiles(x: np.ndarray, gid: np.ndarray, n_groups: int, q: float) -> np.ndarray:
+    """
+    Per-group q-quantile of x (linear interpolation, NaNs skipped), returned per group.
+
+    Same values as groupby(gid).quantile(q): the rows are sorted once by (gid, x) so each
+    group is a contiguous ascending run (NaNs last), and the two order statistics around
+    q * (n - 1) are gathered for every group at once. Groups with no valid x get NaN.
+    """
+    order = np.lexsort((x, gid))
+    xs = x[order]
+    size = np.bincount(gid, minlength=n_groups)
+    n_valid = np.bincount(gid[~np.isnan(x)], minlength=n_groups)
+    start = np.concatenate(([0], np.cumsum(size)[:-1]))
+
+    has = n_valid > 0
+    pos = q * (n_valid[has] - 1)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, n_valid[has] - 1)
+    v_lo = xs[start[has] + lo]
+    v_hi = xs[start[has] + hi]
+
+    out = np.full(n_groups, np.nan)
+    out[has] = v_lo + (v_hi - v_lo) * (pos - lo)
+    return out
+
+
 # ---------------------------------------------------------------------
 # Classify match contexts using team-season xPts terciles
 # ---------------------------------------------------------------------
 
-def add_stakes_category(df: pd.DataFrame) -> pd.DataFrame:
+STAKES_DTYPE = pd.CategoricalDtype(["hard", "medium", "easy"])
+
+
+def stakes_codes(df: pd.DataFrame) -> np.ndarray:
     """
-    For each team-season, classify matches into stakes categories using xPts terciles.
+    For each team-season, classify matches into stakes categories using xPts terciles,
+    returned as one int8 code per row (0 = hard, 1 = medium, 2 = easy; see STAKES_DTYPE).
 
     hard   = bottom tercile of xPts (team expected points are low)
     medium = middle tercile
@@ -123,29 +205,30 @@ def add_stakes_category(df: pd.DataFrame) -> pd.DataFrame:
     - Using xPts (rather than opponent table position) keeps the definition consistent
       with the odds-based expected performance approach used elsewhere in the project.
     """
-    df = df.copy()
-
-    def team_season_stakes(sub: pd.DataFrame) -> pd.DataFrame:
-        # Drop missing xpts inside group to avoid quantile issues
-        sub = sub.copy()
-        x = sub["xpts"]
-
-        q_low = x.quantile(1 / 3)
-        q_high = x.quantile(2 / 3)
+    # Team-season terciles from one sorted layout keyed on integer team-season ids (no
+    # groupby hash tables), broadcast back to rows by id
+    x = df["xpts"].to_numpy(dtype="float64")
+    ts_id, rep = _group_ids(df, ["team_id", "season"])
+    q_low = _group_quantiles(x, ts_id, len(rep), 1 / 3)[ts_id]
+    q_high = _group_quantiles(x, ts_id, len(rep), 2 / 3)[ts_id]
+
+    # Vectorised over the whole column: <= q_low is hard (written last, so it wins ties with
+    # easy), >= q_high is easy, anything else (including missing xpts) is medium. Codes are
+    # written straight into an int8 array (no int64 temporaries), not Python strings.
+    codes = np.ones(len(x), dtype=np.int8)
+    codes[x >= q_high] = 2
+    codes[x <= q_low] = 0
+    return codes
 
-        def categorize(v: float) -> str:
-            if v <= q_low:
-                return "hard"
-            if v >= q_high:
-                return "easy"
-            return "medium"
 
-        sub["stakes"] = sub["xpts"].apply(categorize)
-        return sub
+def add_stakes_category(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a copy of df with the stakes classification (see stakes_codes) as a categorical column.
 
-    # Group by team + season (context must be team-season specific)
-    out = df.groupby(["team_id", "season"], group_keys=False).apply(team_season_stakes)
-    return out
+    Rows keep df's order. The proxy itself does not need it: compute_rotation_elasticity
+    classifies on the fly when df has no stakes column.
+    """
+    return df.assign(stakes=pd.Categorical.from_codes(stakes_codes(df), dtype=STAKES_DTYPE))
 
 
 # ---------------------------------------------------------------------
@@ -161,55 +244,54 @@ def compute_rotation_elasticity(
     """
     For each player-team-season, compute start rates by context and the elasticity metric.
 
+    Uses df["stakes"] if present (see add_stakes_category); otherwise the stakes codes are
+    computed here and consumed directly, without being stored on the panel.
+
     Filters:
     - min_matches: minimum total matches observed for that player-team-season
     - min_hard/min_easy: minimum matches in the hard/easy terciles
     """
-    df = df.copy()
-    df["appearance"] = 1
-    df["started_int"] = df["started"].astype(int)
-
-    def agg_rates(sub: pd.DataFrame) -> pd.Series:
-        n_matches = int(sub["appearance"].sum())
-        n_starts = int(sub["started_int"].sum())
-        start_rate_all = n_starts / n_matches if n_matches > 0 else np.nan
-
-        hard = sub[sub["stakes"] == "hard"]
-        n_hard = int(hard["appearance"].sum())
-        n_hard_starts = int(hard["started_int"].sum())
-        start_rate_hard = n_hard_starts / n_hard if n_hard > 0 else np.nan
-
-        easy = sub[sub["stakes"] == "easy"]
-        n_easy = int(easy["appearance"].sum())
-        n_easy_starts = int(easy["started_int"].sum())
-        start_rate_easy = n_easy_starts / n_easy if n_easy > 0 else np.nan
-
-        rotation_elasticity = (
-            float(start_rate_hard - start_rate_easy)
-            if np.isfinite(start_rate_hard) and np.isfinite(start_rate_easy)
-            else np.nan
-        )
-
-        return pd.Series(
-            {
-                "n_matches": n_matches,
-                "n_starts": n_starts,
-                "start_rate_all": start_rate_all,
-                "n_hard": n_hard,
-                "n_hard_starts": n_hard_starts,
-                "start_rate_hard": start_rate_hard,
-                "n_easy": n_easy,
-                "n_easy_starts": n_easy_starts,
-                "start_rate_easy": start_rate_easy,
-                "rotation_elasticity": rotation_elasticity,
-            }
-        )
-
-    grouped = (
-        df.groupby(["player_id", "player_name", "team_id", "season"])
-        .apply(agg_rates)
-        .reset_index()
-    )
+    # One integer group id per row (sorted key order, as groupby would emit); the counts are
+    # np.bincount passes over it: no groupby hash tables, no per-group Python.
+    keys = ["player_id", "player_name", "team_id", "season"]
+    gid, rep = _group_ids(df, keys)
+    n_groups = len(rep)
+
+    # Integer counts straight from the bool/int8 columns: one bincount over (group, stakes)
+    # cells for appearances and one over the started rows, reshaped to (n_groups, 3)
+    # (columns: 0 = hard, 1 = medium, 2 = easy). No float weights or per-mask temporaries.
+    started = df["started"].to_numpy(dtype=bool)
+    stakes = df["stakes"].cat.codes.to_numpy() if "stakes" in df.columns else stakes_codes(df)
+    cell = gid * 3 + stakes
+    n_by_stakes = np.bincount(cell, minlength=3 * n_groups).reshape(n_groups, 3)
+    starts_by_stakes = np.bincount(cell[started], minlength=3 * n_groups).reshape(n_groups, 3)
+
+    n_matches = n_by_stakes.sum(axis=1)
+    n_starts = starts_by_stakes.sum(axis=1)
+    n_hard, n_easy = n_by_stakes[:, 0], n_by_stakes[:, 2]
+    n_hard_starts, n_easy_starts = starts_by_stakes[:, 0], starts_by_stakes[:, 2]
+
+    def rate(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+        # num / den, NaN where there are no matches in that context
+        return np.divide(num, den, out=np.full(n_groups, np.nan), where=den > 0)
+
+    start_rate_hard = rate(n_hard_starts, n_hard)
+    start_rate_easy = rate(n_easy_starts, n_easy)
+
+    # Key values from one row of each group. The counts are published as float64, as the
+    # summed 0/1 columns were before, so the CSV keeps its "16.0" formatting.
+    grouped = pd.DataFrame({k: df[k].to_numpy()[rep] for k in keys})
+    grouped["n_matches"] = n_matches.astype(np.float64)
+    grouped["n_starts"] = n_starts.astype(np.float64)
+    grouped["start_rate_all"] = rate(n_starts, n_matches)
+    grouped["n_hard"] = n_hard.astype(np.float64)
+    grouped["n_hard_starts"] = n_hard_starts.astype(np.float64)
+    grouped["start_rate_hard"] = start_rate_hard
+    grouped["n_easy"] = n_easy.astype(np.float64)
+    grouped["n_easy_starts"] = n_easy_starts.astype(np.float64)
+    grouped["start_rate_easy"] = start_rate_easy
+    # NaN unless both context rates exist
+    grouped["rotation_elasticity"] = start_rate_hard - start_rate_easy
 
     keep = (
         (grouped["n_matches"] >= min_matches)
@@ -277,7 +359,7 @@ def main() -> None:
     df = load_panel_rotation(panel_path)
     logger.info("Rotation panel loaded: shape=%s", df.shape)
 
-    df = add_stakes_category(df)
+    # Stakes are classified inside compute_rotation_elasticity; no column is added to the panel
     rot = compute_rotation_elasticity(
         df,
         min_matches=int(args.min_matches),
@@ -293,8 +375,14 @@ def main() -> None:
         print(f"[OK] dry-run complete | rotation proxy shape: {rot.shape} | output NOT written")
         return
 
+    # The CSV is formatted straight from the DataFrame; the parquet sibling (read by
+    # combine_proxies in place of re-parsing the CSV) is the only Arrow conversion
     out_csv.parent.mkdir(parents=True, exist_ok=True)
-    atomic_write_csv(rot, out_csv, index=False)
+    atomic_write_csv(rot, out_csv)
+    try:
+        write_parquet_sibling(rot, out_csv)
+    except Exception as e:
+        logger.warning("Parquet write skipped: %s", e)
 
     logger.info("Saved rotation elasticity proxy: %s (rows=%s)", out_csv, len(rot))
     print(f"[OK] Saved rotation elasticity proxy | shape={rot.shape}")
@@ -30,16 +30,19 @@ Notes:
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+import math
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
-import statsmodels.formula.api as smf
+import pyarrow.parquet as pq
 
 from src.utils.config import Config
 from src.utils.logging_setup import setup_logger
 from src.utils.run_metadata import write_run_metadata
-from src.utils.io import atomic_write_csv
+from src.utils.io import atomic_write_csv, atomic_write_parquet, read_csv_arrow, read_csv_header
+from src.utils.text import clean_str
 
 
 # ---------------------------------------------------------------------
@@ -53,19 +56,35 @@ RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 # ---------------------------------------------------------------------
 # IO helpers
 # ---------------------------------------------------------------------
-def _read_panel(path: Path) -> pd.DataFrame:
-    """Read panel from parquet or csv."""
+def _panel_columns(path: Path) -> list[str]:
+    """Column names of the panel, from the parquet schema or the CSV header (no data read)."""
     if not path.exists():
         raise FileNotFoundError(f"Panel not found: {path}")
 
     if path.suffix.lower() == ".parquet":
-        return pd.read_parquet(path)
+        return pq.read_schema(path).names
     if path.suffix.lower() == ".csv":
-        return pd.read_csv(path)
+        return read_csv_header(path)
 
     raise ValueError(f"Unsupported panel format: {path.suffix} (expected .parquet or .csv)")
 
 
+def _read_panel(path: Path, columns: list[str]) -> pd.DataFrame:
+    """
+    Read only the given columns (in that order) from a parquet or csv panel.
+
+    The projection happens in the reader (parquet column chunks / Arrow CSV include_columns),
+    so unused panel columns are never materialised. For parquet, the Arrow table's buffers
+    are released column by column as they are converted (self_destruct), so the panel is not
+    held twice (Arrow + pandas) at peak.
+    """
+    if path.suffix.lower() == ".parquet":
+        table = pq.read_table(path, columns=columns)
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+    # read_csv_arrow keeps header order
+    return read_csv_arrow(path, columns=columns).reindex(columns=columns)
+
+
 def load_panel(panel_path: Path, logger) -> tuple[pd.DataFrame, str]:
     """
     Load the injury panel and standardise minimal columns needed for regression.
@@ -74,17 +93,17 @@ def load_panel(panel_path: Path, logger) -> tuple[pd.DataFrame, str]:
     - df: cleaned DataFrame
     - player_key: either 'player_name' or 'player_id' (auto-detected)
     """
-    df = _read_panel(panel_path)
+    columns = _panel_columns(panel_path)
 
     # Detect player key for grouping/estimation
-    if "player_name" in df.columns:
+    if "player_name" in columns:
         player_key = "player_name"
-    elif "player_id" in df.columns:
+    elif "player_id" in columns:
         player_key = "player_id"
     else:
         raise ValueError(
             "panel_injury is missing both 'player_name' and 'player_id'. "
-            f"Columns={list(df.columns)}"
+            f"Columns={list(columns)}"
         )
 
     needed = [
@@ -98,19 +117,22 @@ def load_panel(panel_path: Path, logger) -> tuple[pd.DataFrame, str]:
         "n_injured_squad",
         player_key,
     ]
-    missing = [c for c in needed if c not in df.columns]
+    missing = [c for c in needed if c not in columns]
     if missing:
         raise ValueError(f"Missing columns in panel_injury: {missing}")
 
-    out = df[needed].copy()
+    out = _read_panel(panel_path, needed)
 
     # Basic typing / cleaning
-    out["date"] = pd.to_datetime(out["date"], errors="coerce")
+    if not pd.api.types.is_datetime64_any_dtype(out["date"]):
+        out["date"] = pd.to_datetime(out["date"], errors="coerce", format="ISO8601")
     out["season"] = pd.to_numeric(out["season"], errors="coerce").astype(int)
 
-    out["team_id"] = out["team_id"].astype(str).str.strip()
-    out["opponent_id"] = out["opponent_id"].astype(str).str.strip()
-    out[player_key] = out[player_key].astype(str).str.strip()
+    out["team_id"] = clean_str(out["team_id"])
+    out["opponent_id"] = clean_str(out["opponent_id"])
+    # Integer opponent codes in sorted-name order, for the opponent dummies and clusters
+    out["opponent_code"] = pd.factorize(out["opponent_id"], sort=True)[0]
+    out[player_key] = clean_str(out[player_key])
 
     out["unavailable"] = pd.to_numeric(out["unavailable"], errors="coerce").fillna(0).astype(int)
     out["xpts"] = pd.to_numeric(out["xpts"], errors="coerce")
@@ -162,43 +184,88 @@ def filter_player_seasons(summary: pd.DataFrame, min_unavail: int, min_avail: in
 # ---------------------------------------------------------------------
 # Estimation: one regression per player-team-season
 # ---------------------------------------------------------------------
-def estimate_one(df: pd.DataFrame, player_key: str, pid: str, tid: str, season: int, logger) -> dict | None:
+def _fit_unavailable(y: np.ndarray, X: np.ndarray, col: int, clusters: np.ndarray | None) -> tuple[float, float, float]:
+    """
+    OLS of y on X; return (beta, se, p-value) for column col.
+
+    Reproduces what statsmodels' OLS(...).fit() reports for this one coefficient, without
+    the formula parsing and results object (which cost far more than the solve for
+    ~30-row regressions):
+    - the fit uses the SVD pseudo-inverse (rcond 1e-15), so rank-deficient designs
+      (e.g. collinear opponent dummies) get the same minimum-norm solution;
+    - clusters=None gives HC1 errors (scaled by n / (n - rank));
+    - otherwise errors are clustered on the integer codes in clusters (CRV1, with the
+      G/(G-1) * (n-1)/(n-k) small-sample correction);
+    - p-values are two-sided normal, as for any robust cov_type without use_t.
+    """
+    n, k = X.shape
+    u, sv, vt = np.linalg.svd(X, full_matrices=False)
+    sv_inv = np.zeros_like(sv)
+    keep = sv > 1e-15 * sv.max()
+    sv_inv[keep] = 1.0 / sv[keep]
+    pinv = (vt.T * sv_inv) @ u.T
+    rank = int((sv > sv.max() * k * np.finfo(float).eps).sum())
+
+    params = pinv @ y
+    resid = y - X @ params
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if clusters is None:
+            # n == rank gives an infinite SE (as statsmodels does), not ZeroDivisionError
+            var = (pinv[col] ** 2) @ (resid**2) * (np.float64(n) / (n - rank))
+        else:
+            # Row col of the sandwich: b = (X'X)^+ row, scores summed within each cluster
+            b = pinv[col] @ pinv.T
+            n_groups = int(clusters.max()) + 1
+            sums = np.bincount(clusters, weights=resid * (X @ b), minlength=n_groups)
+            # Python float division: n == k raises ZeroDivisionError, as statsmodels does, and
+            # estimate_one skips the fit
+            var = (sums @ sums) * (n_groups / (n_groups - 1.0)) * ((n - 1.0) / float(n - k))
+        se = float(np.sqrt(var))
+        z = abs(params[col] / se)
+    pval = math.erfc(z / math.sqrt(2.0)) if np.isfinite(z) else np.nan
+    return float(params[col]), se, pval
+
+
+def estimate_one(g: pd.DataFrame, player_key: str, pid: str, tid: str, season: int, logger) -> dict | None:
     """
     Estimate the unavailable effect for one player-team-season.
 
+    g holds that player-team-season's rows only (run_did slices them out of the panel).
     Returns a dict of estimates (beta, SE, p-value, sample sizes), or None if not identified.
+
+    Model: xpts ~ unavailable + n_injured_squad + C(opponent_id) + match_index, with the
+    design matrix built directly (intercept, treatment-coded opponent dummies against the
+    first opponent in sorted order, then the three regressors) and solved by _fit_unavailable.
     """
-    g = df[(df[player_key] == pid) & (df["team_id"] == tid) & (df["season"] == season)].copy()
-    g = g.sort_values("date")
+    order = np.argsort(g["date"].to_numpy(), kind="stable")  # rows mostly arrive in date order
+    unavailable = g["unavailable"].to_numpy()[order]
 
     # Need both unavailable=0 and unavailable=1 within this season for identification
-    if g["unavailable"].nunique() < 2:
+    if len(np.unique(unavailable)) < 2:
         return None
 
+    # Opponent FE: opponent_code is sorted-factorized in load_panel, so re-coding within the
+    # group keeps sorted-name level order (level 0 is the reference)
+    _, opp = np.unique(g["opponent_code"].to_numpy()[order], return_inverse=True)
+    opp = opp.ravel()
+    n_clusters = int(opp.max()) + 1
+    n = len(order)
+
+    X = np.empty((n, n_clusters + 3))
+    X[:, 0] = 1.0
+    X[:, 1:n_clusters] = opp[:, None] == np.arange(1, n_clusters)
+    X[:, n_clusters] = unavailable
+    X[:, n_clusters + 1] = g["n_injured_squad"].to_numpy()[order]
     # Numeric time trend within this team-season (avoids saturated time FE)
-    g["match_index"] = np.arange(len(g), dtype=int)
-
-    # Opponent FE: ensure it is treated as categorical in the formula
-    g["opponent_id"] = g["opponent_id"].astype(str)
+    X[:, n_clusters + 2] = np.arange(n)
+    y = g["xpts"].to_numpy(dtype="float64")[order]
 
     # Covariance choice: cluster by opponent if enough clusters; else robust HC1
-    n_clusters = int(g["opponent_id"].nunique())
-    if n_clusters >= 10:
-        cov_type = "cluster"
-        fit_kw = {"cov_type": "cluster", "cov_kwds": {"groups": g["opponent_id"]}}
-    else:
-        cov_type = "HC1"
-        fit_kw = {"cov_type": "HC1"}
+    cov_type = "cluster" if n_clusters >= 10 else "HC1"
 
     try:
-        model = smf.ols(
-            "xpts ~ unavailable + n_injured_squad + C(opponent_id) + match_index",
-            data=g,
-        ).fit(**fit_kw)
-
-        beta = float(model.params.get("unavailable", np.nan))
-        se = float(model.bse.get("unavailable", np.nan))
-        pval = float(model.pvalues.get("unavailable", np.nan))
+        beta, se, pval = _fit_unavailable(y, X, n_clusters, opp if cov_type == "cluster" else None)
 
         return {
             player_key: pid,
@@ -207,9 +274,9 @@ def estimate_one(df: pd.DataFrame, player_key: str, pid: str, tid: str, season:
             "beta_unavailable": beta,
             "se_unavailable": se,
             "pvalue_unavailable": pval,
-            "n_matches": int(len(g)),
-            "n_unavail": int(g["unavailable"].sum()),
-            "n_avail": int((g["unavailable"] == 0).sum()),
+            "n_matches": int(n),
+            "n_unavail": int(unavailable.sum()),
+            "n_avail": int((unavailable == 0).sum()),
             "cov_type": cov_type,
             "n_opp_clusters": n_clusters,
         }
@@ -221,21 +288,38 @@ def estimate_one(df: pd.DataFrame, player_key: str, pid: str, tid: str, season:
         return None
 
 
-def run_did(df: pd.DataFrame, player_key: str, min_unavail: int, min_avail: int, logger) -> pd.DataFrame:
-    """Run all player-team-season regressions and return the stacked results table."""
+# Columns estimate_one reads; only these are shipped to worker processes
+_FIT_COLS = ["date", "unavailable", "opponent_code", "n_injured_squad", "xpts"]
+
+
+def run_did(
+    df: pd.DataFrame, player_key: str, min_unavail: int, min_avail: int, logger, n_jobs: int = 1
+) -> pd.DataFrame:
+    """
+    Run all player-team-season regressions and return the stacked results table.
+
+    The regressions are independent: with n_jobs > 1 they are spread over that many worker
+    processes (in batches, results kept in summary order so the output is deterministic).
+    """
     summary = summarise_player_seasons(df, player_key)
     good = filter_player_seasons(summary, min_unavail=min_unavail, min_avail=min_avail, logger=logger)
 
-    results: list[dict] = []
-    for _, row in good.iterrows():
-        pid = str(row[player_key])
-        tid = str(row["team_id"])
-        season = int(row["season"])
+    # Row positions of every player-team-season from one hash partition of the panel, so each
+    # regression slices its rows with iloc instead of re-scanning the panel with a mask
+    rows = df.groupby([player_key, "team_id", "season"], dropna=False).indices
+    panel = df[_FIT_COLS]
 
-        est = estimate_one(df, player_key, pid, tid, season, logger)
-        if est is not None:
-            results.append(est)
+    jobs = [
+        (panel.iloc[rows[(pid, tid, season)]], player_key, str(pid), str(tid), int(season), logger)
+        for pid, tid, season in zip(good[player_key], good["team_id"], good["season"])
+    ]
+    if n_jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as ex:
+            estimates = list(ex.map(estimate_one, *zip(*jobs), chunksize=64))
+    else:
+        estimates = [estimate_one(*job) for job in jobs]
 
+    results = [est for est in estimates if est is not None]
     return pd.DataFrame(results) if results else pd.DataFrame()
 
 
@@ -249,6 +333,12 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--min-avail", type=int, default=2, help="Min available matches per player-season")
     p.add_argument("--out-csv", type=str, default=None, help="Override output CSV path")
     p.add_argument("--out-parquet", type=str, default=None, help="Override output parquet path")
+    p.add_argument(
+        "--n-jobs",
+        type=int,
+        default=1,
+        help="Worker processes for the per-player-season regressions (default: 1, sequential)",
+    )
     p.add_argument("--dry-run", action="store_true", help="Run estimation but do not write outputs")
     return p.parse_args()
 
@@ -283,7 +373,14 @@ def main() -> None:
     logger.info("Filters: min_unavail=%d min_avail=%d", args.min_unavail, args.min_avail)
 
     df, player_key = load_panel(panel_path, logger)
-    did = run_did(df, player_key, min_unavail=int(args.min_unavail), min_avail=int(args.min_avail), logger=logger)
+    did = run_did(
+        df,
+        player_key,
+        min_unavail=int(args.min_unavail),
+        min_avail=int(args.min_avail),
+        logger=logger,
+        n_jobs=int(args.n_jobs),
+    )
 
     if did.empty:
         logger.warning("No DiD estimates produced. Try lowering thresholds or inspect panel coverage.")
@@ -303,7 +400,7 @@ def main() -> None:
 
     # Parquet is optional; do not fail the pipeline if parquet engines are missing
     try:
-        did.to_parquet(out_parquet, index=False)
+        atomic_write_parquet(did, out_parquet)
         parquet_status = "written"
     except Exception as e:
         parquet_status = f"skipped ({type(e).__name__}: {e})"
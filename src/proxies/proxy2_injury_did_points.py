@@ -31,7 +31,7 @@ import pandas as pd
 from src.utils.config import Config
 from src.utils.logging_setup import setup_logger
 from src.utils.run_metadata import write_run_metadata
-from src.utils.io import atomic_write_csv
+from src.utils.io import atomic_write_csv, atomic_write_parquet
 
 
 # ---------------------------------------------------------------------
@@ -255,7 +255,7 @@ def main() -> None:
     # Parquet optional
     try:
         out_parquet.parent.mkdir(parents=True, exist_ok=True)
-        did_full.to_parquet(out_parquet, index=False)
+        atomic_write_parquet(did_full, out_parquet)
         parquet_status = "written"
     except Exception as e:
         parquet_status = f"skipped ({type(e).__name__}: {e})"
@@ -8,6 +8,7 @@ Inputs (defaults):
 
 Output (default):
   - results/proxy2_injury_final_named.csv
+  - results/proxy2_injury_final_named.parquet   (optional; read by combine_proxies)
 
 Robust to two DiD schemas:
   A) preferred: has player_name column
@@ -20,6 +21,9 @@ import argparse
 
 import pandas as pd
 
+from src.utils.io import atomic_write_csv, write_parquet_sibling
+from src.utils.text import clean_str
+
 
 # ---------------------------------------------------------------------
 # IO helpers
@@ -52,11 +56,11 @@ def load_did(path: Path) -> pd.DataFrame:
     df.columns = [c.strip() for c in df.columns]
 
     if "player_name" in df.columns:
-        df["player_name"] = df["player_name"].astype(str).str.strip()
+        df["player_name"] = clean_str(df["player_name"])
         df["injury_player_name_raw"] = df["player_name"]
     elif "player_id" in df.columns:
         # Older schema: player_id contains a name-like string
-        df["player_id"] = df["player_id"].astype(str).str.strip()
+        df["player_id"] = clean_str(df["player_id"])
         df["player_name"] = df["player_id"]
         df["injury_player_name_raw"] = df["player_id"]
     else:
@@ -67,7 +71,7 @@ def load_did(path: Path) -> pd.DataFrame:
     if "team_id" not in df.columns:
         raise ValueError(f"DiD file missing team_id. Columns={df.columns.tolist()}")
 
-    df["team_id"] = df["team_id"].astype(str).str.strip()
+    df["team_id"] = clean_str(df["team_id"])
 
     if "season" in df.columns:
         df["season"] = pd.to_numeric(df["season"], errors="coerce").astype("Int64")
@@ -101,8 +105,8 @@ def load_understat_lookups(path: Path) -> tuple[pd.DataFrame, pd.DataFrame]:
 
     tmp = pd.DataFrame(
         {
-            "player_name": df["player_name"].astype(str).str.strip(),
-            "team_id": df["team"].astype(str).str.strip(),
+            "player_name": clean_str(df["player_name"]),
+            "team_id": clean_str(df["team"]),
             "player_id": pd.to_numeric(df["player_id"], errors="coerce").astype("Int64"),
         }
     ).dropna(subset=["player_id"])
@@ -211,7 +215,11 @@ def main() -> None:
         return
 
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    out.to_csv(out_path, index=False)
+    atomic_write_csv(out, out_path, index=False)
+    try:
+        write_parquet_sibling(out, out_path)
+    except Exception as e:
+        print(f"⚠️ Parquet write skipped: {e}")
     print(f"✅ Saved final named injury proxy to {out_path} | shape={out.shape}")
 
 
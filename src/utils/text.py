@@ -0,0 +1,59 @@
+"""
+String-column helpers.
+
+Why this exists:
+- Name/team columns are cleaned (str + strip) in almost every loader.
+- These columns have few distinct values (20-30 teams, a few thousand players) but many rows,
+  so cleaning each distinct value once is much cheaper than a Python call per row.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+
+def map_unique(s: pd.Series, fn: Callable[[object], object], skipna: bool = False) -> pd.Series:
+    """
+    Equivalent to s.map(fn), with fn called once per distinct value.
+
+    The column is factorized, fn is applied to each unique value in Python, and the results are
+    gathered back by code. Missing values are passed to fn as well (all NaN/None share one call)
+    unless skipna=True, in which case they stay NaN.
+    """
+    codes, uniques = pd.factorize(s, use_na_sentinel=skipna)
+    # Last slot is what code -1 (a missing value with skipna=True) gathers
+    mapped = np.empty(len(uniques) + 1, dtype=object)
+    mapped[:-1] = [fn(u) for u in uniques]
+    mapped[-1] = np.nan
+    return pd.Series(mapped[codes], index=s.index, name=s.name)
+
+
+def clean_str(s: pd.Series) -> pd.Series:
+    """
+    Equivalent to s.astype(str).str.strip(), evaluated once per distinct value (see map_unique).
+
+    Missing values (NaN or None, e.g. nulls from an Arrow read) all become 'nan', as they do for
+    a pd.read_csv column.
+    """
+    return map_unique(s, lambda u: str(u).strip())
+
+
+def str_categorical(s: pd.Series) -> pd.Series:
+    """
+    Equivalent to s.astype(str).astype("category"), evaluated once per distinct value.
+
+    Categories are the sorted distinct strings, as astype("category") produces. Raw values that
+    render to the same string (e.g. 1 and "1") share one category. As in clean_str, missing
+    values (NaN or None) all become 'nan', so parquet and CSV reads of a column agree.
+    """
+    codes, uniques = pd.factorize(s, use_na_sentinel=False)
+    labels = np.array([str(u) for u in uniques], dtype=object)
+    categories, remap = np.unique(labels, return_inverse=True)
+    return pd.Series(
+        pd.Categorical.from_codes(remap.ravel()[codes], categories=categories),
+        index=s.index,
+        name=s.name,
+    )
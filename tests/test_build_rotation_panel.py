@@ -0,0 +1,127 @@
+"""build_rotation_panel against the pandas merge/groupby version it replaced."""
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.proxies.build_rotation_panel import _assert_unique_keys, build_rotation_panel
+
+LOGGER = logging.getLogger("test_build_rotation_panel")
+
+
+def _matches() -> pd.DataFrame:
+    dates = pd.to_datetime(["2020-09-12", "2020-09-19", "2020-09-26", "2020-11-21", "2020-11-24"])
+    rows = []
+    for i, d in enumerate(dates):
+        for team, opp, home in [("T1", "T2", True), ("T2", "T1", False)]:
+            rows.append(
+                {
+                    "match_id": 100 + i,
+                    "season": np.int16(2020),
+                    "date": d,
+                    "team_id": team,
+                    "opponent_id": opp,
+                    "is_home": home,
+                    "xpts": 1.0 + 0.1 * i + (0.5 if home else 0.0),
+                }
+            )
+    return pd.DataFrame(rows).astype({"season": "int16", "date": "datetime64[s]"})
+
+
+def _understat() -> pd.DataFrame:
+    # Player 7: several appearances, including a 56-day gap (clipped to 30) and a cup date
+    # with no league match (dropped). Player 3: moves from T1 to T2 (rest is player-level).
+    # Player 5: a single appearance (30-day default). Two rows without a player_id are not one
+    # player, so both get the default. Rows are not in date order.
+    rows = [
+        (7, "T1", "2020-09-26"),
+        (3, "T1", "2020-09-12"),
+        (7, "T1", "2020-09-12"),
+        (5, "T2", "2020-09-19"),
+        (7, "T1", "2020-09-30"),
+        (7, "T1", "2020-11-21"),
+        (3, "T2", "2020-11-24"),
+        (7, "T1", "2020-11-24"),
+        (3, "T1", "2020-09-19"),
+        (None, "T2", "2020-09-26"),
+        (None, "T2", "2020-09-12"),
+    ]
+    df = pd.DataFrame(rows, columns=["player_id", "team_id", "date"])
+    return pd.DataFrame(
+        {
+            "season": np.int16(2020),
+            "date": pd.to_datetime(df["date"]).astype("datetime64[s]"),
+            "team_id": df["team_id"],
+            "player_id": df["player_id"].astype("Int32"),
+            "player_name": "P" + df["player_id"].astype(str),
+            "minutes": 90.0,
+            "started": True,
+        }
+    ).astype({"season": "int16"})
+
+
+def _old_panel(matches: pd.DataFrame, under: pd.DataFrame) -> pd.DataFrame:
+    panel = under.merge(matches, on=["season", "date", "team_id"], how="inner", validate="many_to_one")
+    panel = panel.sort_values(["player_id", "date"])
+    panel["days_rest"] = panel.groupby("player_id")["date"].diff().dt.days
+    panel["days_rest"] = panel["days_rest"].fillna(30).astype(float).clip(lower=0, upper=30)
+    return panel
+
+
+def test_days_rest_matches_groupby_diff():
+    matches, under = _matches(), _understat()
+    new = build_rotation_panel(matches, under, LOGGER).to_pandas()
+    old = _old_panel(matches, under)[new.columns].reset_index(drop=True)
+
+    assert len(new) == len(under) - 1  # the cup date is dropped
+    pd.testing.assert_frame_equal(new, old, check_dtype=False)
+    rest = dict(zip(zip(new["player_id"], new["date"].dt.strftime("%m-%d")), new["days_rest"]))
+    assert rest[(5, "09-19")] == 30  # only appearance
+    assert rest[(3, "11-24")] == 30  # 66 days after the previous one, clipped
+    assert rest[(7, "09-26")] == 14
+    assert new.loc[new["player_id"].isna(), "days_rest"].tolist() == [30, 30]
+
+
+def test_duplicate_league_match_raises():
+    # A repeated (season, date, team) fixture would fan Understat rows out (many-to-many)
+    matches = _matches()
+    matches = pd.concat([matches, matches.iloc[[0]]], ignore_index=True)
+    with pytest.raises(ValueError, match="many-to-one"):
+        build_rotation_panel(matches, _understat(), LOGGER)
+
+
+def test_panel_is_stable_across_runs():
+    matches, under = _matches(), _understat()
+    first = build_rotation_panel(matches, under, LOGGER)
+    for _ in range(3):
+        assert build_rotation_panel(matches, under, LOGGER).equals(first)
+
+
+KEYS = ["season", "date", "team_id"]
+
+
+def test_assert_unique_keys_passes_unique():
+    _assert_unique_keys(_matches(), KEYS, "matches", LOGGER)
+
+
+def test_assert_unique_keys_raises_on_duplicate():
+    m = _matches()
+    dup = pd.concat([m, m.iloc[[3]]], ignore_index=True)
+    with pytest.raises(ValueError, match=r"Found 1 duplicate rows"):
+        _assert_unique_keys(dup, KEYS, "matches", LOGGER)
+
+
+def test_assert_unique_keys_treats_missing_as_equal():
+    # As DataFrame.duplicated: NaN team ids and NaT dates match each other
+    m = _matches().iloc[:3].copy()
+    m["team_id"] = m["team_id"].astype(object)
+    m.loc[[0, 1], "team_id"] = np.nan
+    m.loc[[0, 1], "date"] = pd.NaT
+    assert m.duplicated(KEYS).sum() == 1
+    with pytest.raises(ValueError, match=r"Found 1 duplicate rows"):
+        _assert_unique_keys(m, KEYS, "matches", LOGGER)
+    # Missing in only one of the two rows is not a duplicate
+    m.loc[1, "date"] = m.loc[2, "date"]
+    _assert_unique_keys(m, KEYS, "matches", LOGGER)
@@ -0,0 +1,89 @@
+"""combine_proxies key checks."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.proxies.combine_proxies import _assert_no_duplicate_keys, _outer_join_arrow, _outer_join_pandas
+
+KEYS = ["player_id", "season", "team_id"]
+
+
+def _proxy() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "player_id": pd.array([1, 2, 3, 4], dtype="Int32"),
+            "season": pd.array([2020, 2020, 2021, 2021], dtype="Int16"),
+            "team_id": ["A", "B", "A", "B"],
+            "x": [0.1, 0.2, 0.3, 0.4],
+        }
+    )
+
+
+def test_unique_keys_pass():
+    _assert_no_duplicate_keys(_proxy(), KEYS, "proxy")
+
+
+def test_duplicate_keys_raise():
+    df = _proxy()
+    df = pd.concat([df, df.iloc[[1, 1]]], ignore_index=True)
+    with pytest.raises(ValueError, match=r"\[proxy\] Found 2 duplicate rows"):
+        _assert_no_duplicate_keys(df, KEYS, "proxy")
+
+
+def test_rows_with_missing_keys_are_skipped():
+    # As the dropna(subset=keys) + duplicated() check it replaced: rows missing any key are left
+    # out, so two rows with the same NaN/<NA> keys are not reported as duplicates
+    df = _proxy()
+    df.loc[[0, 1], "player_id"] = pd.NA
+    df.loc[[0, 1], "season"] = 2020
+    df.loc[[0, 1], "team_id"] = np.nan
+    assert df.duplicated(KEYS).sum() == 1
+    _assert_no_duplicate_keys(df, KEYS, "proxy")
+
+    # ...but a duplicate among the complete rows still raises
+    df = pd.concat([df, df.iloc[[3]]], ignore_index=True)
+    with pytest.raises(ValueError, match=r"Found 1 duplicate rows"):
+        _assert_no_duplicate_keys(df, KEYS, "proxy")
+
+
+def test_missing_key_column_raises():
+    with pytest.raises(ValueError):
+        _assert_no_duplicate_keys(_proxy().drop(columns="team_id"), KEYS, "proxy")
+
+
+def _join_inputs() -> tuple[pd.DataFrame, pd.DataFrame]:
+    # As main() hands them to the join: categorical team_id over both sides, nullable keys
+    rot = pd.DataFrame(
+        {
+            "player_id": pd.array([1, 2, 3, pd.NA], dtype="Int32"),
+            "season": pd.array([2020, pd.NA, 2021, 2021], dtype="Int16"),
+            "team_id": ["A", "B", "A", "B"],
+            "rotation_elasticity": [0.1, 0.2, 0.3, 0.4],
+        }
+    )
+    inj = pd.DataFrame(
+        {
+            "player_id": pd.array([1, 2, 4, pd.NA], dtype="Int32"),
+            "season": pd.array([2020, pd.NA, 2021, 2021], dtype="Int16"),
+            "team_id": ["A", "B", "A", "B"],
+            "beta_unavailable": [-0.1, -0.2, -0.3, -0.4],
+        }
+    )
+    teams = pd.CategoricalDtype(["A", "B"])
+    return rot.astype({"team_id": teams}), inj.astype({"team_id": teams})
+
+
+def test_outer_join_engines_agree_on_null_season():
+    rot, inj = _join_inputs()
+    keys = ["player_id", "season", "team_id"]
+    frames = [
+        join(rot, inj, keys).sort_values(["rotation_elasticity", "beta_unavailable"]).reset_index(drop=True)
+        for join in (_outer_join_pandas, _outer_join_arrow)
+    ]
+    pd.testing.assert_frame_equal(frames[1], frames[0], check_dtype=False)
+    # Player 2's null-season rows are matched to each other, not kept as two one-sided rows
+    p2 = frames[1][frames[1]["player_id"] == 2]
+    assert len(p2) == 1 and p2["season"].isna().all()
+    assert p2[["rotation_elasticity", "beta_unavailable"]].notna().all(axis=None)
+    assert len(frames[1]) == 5
@@ -0,0 +1,68 @@
+"""src.utils.io helpers."""
+
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as pads
+
+from src.utils.io import (
+    atomic_write_csv,
+    parquet_sibling,
+    read_csv_header,
+    scan_csv_dataset,
+    write_parquet_sibling,
+)
+
+
+def test_parquet_sibling_follows_csv_contents(tmp_path):
+    df = pd.DataFrame({"player_id": [1, 2], "team": ["A", "B"], "x": [20.0, 0.5]})
+    csv_path = tmp_path / "proxy.csv"
+    atomic_write_csv(df, csv_path)
+    assert parquet_sibling(csv_path) is None
+
+    pq_path = write_parquet_sibling(df, csv_path)
+    assert parquet_sibling(csv_path) == pq_path
+    pd.testing.assert_frame_equal(pd.read_parquet(pq_path), df)
+
+    # A newer mtime alone (e.g. a git checkout) keeps the sibling
+    st = csv_path.stat()
+    os.utime(csv_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert parquet_sibling(csv_path) == pq_path
+
+    # An edited CSV does not, even if the parquet is newer
+    csv_path.write_text(csv_path.read_text().replace("0.5", "0.75"))
+    os.utime(pq_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**10))
+    assert parquet_sibling(csv_path) is None
+
+
+def test_atomic_write_csv_keeps_pandas_formatting(tmp_path):
+    df = pd.DataFrame({"name": ["A b"], "flag": [True], "x": [20.0]})
+    out = tmp_path / "out.csv"
+    atomic_write_csv(df, out)
+    assert out.read_text() == "name,flag,x\nA b,True,20.0\n"
+
+
+def test_read_csv_header(tmp_path):
+    path = tmp_path / "h.csv"
+    path.write_text('\ufeffSeason,"Team, full",Pts\n2020,A,1\n', encoding="utf-8")
+    assert read_csv_header(path) == ["Season", "Team, full", "Pts"]
+    empty = tmp_path / "empty.csv"
+    empty.write_text("")
+    assert read_csv_header(empty) == []
+
+
+def test_scan_csv_dataset_falls_back_on_mismatch(tmp_path):
+    fmt = pads.CsvFileFormat(convert_options=pacsv.ConvertOptions(column_types={"Pts": pa.int64()}))
+    a, b, c, d = (tmp_path / f"{n}.csv" for n in "abcd")
+    a.write_text("Season,Team,Pts\n2020,A,1\n")
+    b.write_text("Season,Team,Pts\n2021,B,2\n")
+    c.write_text("Season,Club,Pts\n2022,C,3\n")  # different header
+    d.write_text("Season,Team,Pts\n2023,D,x\n")  # value that does not fit int64
+
+    table = scan_csv_dataset([a, b], fmt, columns=["Team", "Pts"])
+    assert sorted(table.column("Pts").to_pylist()) == [1, 2]
+    assert table.column_names == ["Team", "Pts"]
+    assert scan_csv_dataset([a, c], fmt) is None
+    assert scan_csv_dataset([a, d], fmt) is None
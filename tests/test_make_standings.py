@@ -0,0 +1,63 @@
+"""build_standings on a small hand-computed season."""
+
+import pandas as pd
+import pytest
+
+from src.proxies.make_standings import _clean_matches, build_standings
+
+MATCHES = pd.DataFrame(
+    {
+        "HomeTeam": ["Arsenal", "Brentford", "Arsenal ", "Brentford", "Arsenal"],
+        "AwayTeam": ["Brentford", "Arsenal", " Chelsea", "Chelsea", "Burnley"],
+        "FTHG": ["2", "1", "1", "x", "1"],  # "x": unparseable, counts as 0
+        "FTAG": ["2", "0", "1", "1", "2"],
+        "FTR": ["D", "H", None, "A", "A"],  # None: no result, counts for MP and goals only
+    }
+)
+
+# Burnley only plays away; Burnley and Chelsea tie on Pts, GD and GF, so the table falls back
+# to team name order
+EXPECTED = pd.DataFrame(
+    {
+        "Season": "2020-2021",
+        "Position": [1, 2, 3, 4],
+        "HomeTeam": ["Brentford", "Burnley", "Chelsea", "Arsenal"],
+        "MP": [3, 1, 2, 4],
+        "W": [1, 1, 1, 0],
+        "D": [1, 0, 0, 1],
+        "L": [1, 0, 0, 2],
+        "GF": [3, 2, 2, 4],
+        "GA": [3, 1, 1, 6],
+        "GD": [0, 1, 1, -2],
+        "Pts": [4, 3, 3, 1],
+    }
+)
+
+STAT_COLS = ["MP", "W", "D", "L", "GF", "GA", "GD", "Pts"]
+
+
+def _check(table: pd.DataFrame) -> None:
+    assert list(table.columns) == list(EXPECTED.columns)
+    pd.testing.assert_frame_equal(
+        table.astype({c: "int64" for c in STAT_COLS}).reset_index(drop=True),
+        EXPECTED,
+        check_dtype=False,
+    )
+
+
+def test_build_standings_raw_matches():
+    _check(build_standings(MATCHES, "2020-2021"))
+
+
+def test_build_standings_shared_categories():
+    # main() cleans once and passes team names as categoricals shared across seasons, so
+    # teams from other seasons (Everton) must not appear
+    df = _clean_matches(MATCHES)
+    teams = pd.CategoricalDtype(sorted(set(df["HomeTeam"]) | set(df["AwayTeam"]) | {"Everton"}))
+    df = df.astype({"HomeTeam": teams, "AwayTeam": teams})
+    _check(build_standings(df, "2020-2021", clean=False))
+
+
+def test_build_standings_missing_columns():
+    with pytest.raises(ValueError, match="FTR"):
+        build_standings(MATCHES.drop(columns="FTR"), "2020-2021")
@@ -0,0 +1,123 @@
+"""Proxy 1 group helpers against the pandas groupby results they replace."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.proxies.proxy1_rotation_elasticity import (
+    _group_ids,
+    _group_quantiles,
+    add_stakes_category,
+    compute_rotation_elasticity,
+)
+
+
+@pytest.mark.parametrize("q", [1 / 3, 0.5, 2 / 3])
+def test_group_quantiles_match_groupby(q):
+    nan = np.nan
+    groups = {
+        0: [3.0, 1.0, nan, 2.0, 5.0],  # NaNs skipped
+        1: [4.0],  # single row
+        2: [nan, nan],  # all NaN -> NaN
+        3: [1.0, 2.0, 2.0, 3.0],  # q * (n - 1) lands on the tied 2.0s for q = 1/3 and 2/3
+        4: [2.0, 2.0, 2.0, 2.0, 2.0, 2.0, 9.0],  # ties around q * (n - 1) = 2, 3, 4
+        5: [0.5, nan, 0.25],
+    }
+    gid = np.concatenate([np.full(len(v), g) for g, v in groups.items()])
+    x = np.concatenate([np.array(v) for v in groups.values()])
+    # Shuffle so groups are not contiguous in the input
+    perm = np.random.default_rng(0).permutation(len(x))
+    gid, x = gid[perm], x[perm]
+
+    got = _group_quantiles(x, gid, len(groups), q)
+    expected = pd.DataFrame({"gid": gid, "x": x}).groupby("gid")["x"].quantile(q)
+    np.testing.assert_allclose(got, expected.to_numpy(), rtol=1e-12, equal_nan=True)
+    assert np.isnan(got[2])
+
+
+def _check_group_ids(df: pd.DataFrame, keys: list[str]) -> None:
+    gid, rep = _group_ids(df, keys)
+    expected = df.groupby(keys, sort=True, observed=True).ngroup().to_numpy()
+    np.testing.assert_array_equal(gid, expected)
+    # rep points at one row of each group, in group order
+    assert len(rep) == expected.max() + 1
+    np.testing.assert_array_equal(gid[rep], np.arange(len(rep)))
+
+
+def test_group_ids_packed_path():
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame(
+        {
+            "player_id": rng.choice(["p3", "p1", "p2", "p10"], n),
+            "player_name": pd.Categorical(rng.choice(["Bo", "Al", "Cy"], n), categories=["Cy", "Bo", "Al", "Zed"]),
+            "team_id": rng.choice(["T2", "T1"], n),
+            "season": rng.choice([2021, 2019, 2020], n),
+        }
+    )
+    _check_group_ids(df, ["player_id", "player_name", "team_id", "season"])
+    _check_group_ids(df, ["team_id", "season"])
+
+
+def test_group_ids_overflow_falls_back_to_ngroup():
+    # Five keys with 10,000 distinct values each: the packed key space (1e20) overflows int64
+    rng = np.random.default_rng(1)
+    n = 10_000
+    df = pd.DataFrame({f"k{i}": rng.permutation(n) for i in range(4)})
+    df["k4"] = pd.Series(rng.permutation(n)).astype(str)
+    keys = [f"k{i}" for i in range(5)]
+    with pytest.raises(ValueError):
+        np.ravel_multi_index([np.zeros(1, dtype=np.intp)] * 5, [n] * 5)
+    _check_group_ids(df, keys)
+    # Fewer distinct tuples than rows on the fallback path too
+    dup = pd.concat([df, df.iloc[::7]], ignore_index=True)
+    _check_group_ids(dup, keys)
+
+
+@pytest.mark.parametrize("col", ["team_id", "season"])
+def test_group_ids_rejects_missing_keys(col):
+    df = pd.DataFrame({"team_id": ["T1", "T2", "T1"], "season": [2020.0, 2020.0, 2021.0]})
+    df.loc[1, col] = np.nan
+    with pytest.raises(ValueError, match=f"'{col}' has 1 missing values"):
+        _group_ids(df, ["team_id", "season"])
+
+
+def _stakes_panel() -> pd.DataFrame:
+    rng = np.random.default_rng(2)
+    n = 60
+    df = pd.DataFrame(
+        {
+            "player_id": rng.choice(["p1", "p2", "p3"], n),
+            "player_name": "x",
+            "team_id": rng.choice(["T1", "T2"], n),
+            "season": rng.choice([2020, 2021], n),
+            "xpts": rng.choice([0.5, 1.0, 1.5, 2.0, 2.5, np.nan], n),
+            "started": rng.integers(0, 2, n).astype(bool),
+        }
+    )
+    df["player_name"] = df["player_id"].str.upper()
+    return df
+
+
+def test_add_stakes_category_returns_new_frame():
+    df = _stakes_panel()
+    before = df.copy()
+    out = add_stakes_category(df)
+
+    pd.testing.assert_frame_equal(df, before)
+    assert "stakes" not in df.columns
+    pd.testing.assert_frame_equal(out.drop(columns="stakes"), before)
+
+    # Per team-season xPts terciles: <= q(1/3) hard, >= q(2/3) easy, else (and missing) medium
+    g = df.groupby(["team_id", "season"])["xpts"]
+    q_low, q_high = g.transform(lambda x: x.quantile(1 / 3)), g.transform(lambda x: x.quantile(2 / 3))
+    expected = np.where(df["xpts"] <= q_low, "hard", np.where(df["xpts"] >= q_high, "easy", "medium"))
+    assert out["stakes"].astype(str).tolist() == expected.tolist()
+
+
+def test_compute_rotation_elasticity_uses_stakes_column():
+    df = _stakes_panel()
+    pd.testing.assert_frame_equal(
+        compute_rotation_elasticity(add_stakes_category(df), min_matches=1),
+        compute_rotation_elasticity(df, min_matches=1),
+    )
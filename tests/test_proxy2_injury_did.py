@@ -0,0 +1,66 @@
+"""_fit_unavailable against the statsmodels fits it replaces."""
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.formula.api as smf
+
+from src.proxies.proxy2_injury_did import _fit_unavailable
+
+FORMULA = "xpts ~ unavailable + n_injured_squad + C(opponent_id) + match_index"
+
+
+def _panel(n: int = 30, n_opp: int = 5, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "opponent_id": rng.choice([f"t{i}" for i in range(n_opp)], n),
+            "unavailable": rng.integers(0, 2, n),
+            "n_injured_squad": rng.integers(0, 5, n),
+            "match_index": np.arange(n),
+        }
+    )
+    df["xpts"] = 1.5 - 0.3 * df["unavailable"] + 0.05 * df["n_injured_squad"] + rng.normal(0, 0.4, n)
+    return df
+
+
+def _check(model, clusters: np.ndarray | None) -> None:
+    col = model.exog_names.index("unavailable")
+    if clusters is None:
+        res = model.fit(cov_type="HC1")
+    else:
+        res = model.fit(cov_type="cluster", cov_kwds={"groups": clusters})
+    beta, se, pval = _fit_unavailable(model.endog, model.exog, col, clusters)
+    np.testing.assert_allclose(beta, res.params["unavailable"], rtol=1e-9)
+    np.testing.assert_allclose(se, res.bse["unavailable"], rtol=1e-9)
+    np.testing.assert_allclose(pval, res.pvalues["unavailable"], rtol=1e-9)
+
+
+@pytest.mark.parametrize("cov", ["HC1", "cluster"])
+def test_full_rank_matches_statsmodels(cov):
+    df = _panel()
+    model = smf.ols(FORMULA, df)
+    clusters = pd.factorize(df["opponent_id"], sort=True)[0] if cov == "cluster" else None
+    _check(model, clusters)
+
+
+@pytest.mark.filterwarnings("ignore:The design matrix is rank-deficient")
+@pytest.mark.parametrize("cov", ["HC1", "cluster"])
+def test_rank_deficient_matches_statsmodels(cov):
+    # dup repeats the C(opponent_id)[T.t1] dummy, so X'X is singular
+    df = _panel(seed=1)
+    df["dup"] = (df["opponent_id"] == "t1").astype(float)
+    model = smf.ols(FORMULA + " + dup", df)
+    assert np.linalg.matrix_rank(model.exog) == model.exog.shape[1] - 1
+    clusters = pd.factorize(df["opponent_id"], sort=True)[0] if cov == "cluster" else None
+    _check(model, clusters)
+
+
+def test_single_cluster_raises_like_statsmodels():
+    df = _panel(seed=2)
+    model = smf.ols(FORMULA, df)
+    clusters = np.zeros(len(df), dtype=np.intp)
+    with pytest.raises(ZeroDivisionError):
+        model.fit(cov_type="cluster", cov_kwds={"groups": clusters})
+    with pytest.raises(ZeroDivisionError):
+        _fit_unavailable(model.endog, model.exog, model.exog_names.index("unavailable"), clusters)
@@ -0,0 +1,31 @@
+"""src.utils.text helpers against the per-row pandas calls they replace."""
+
+import numpy as np
+import pandas as pd
+
+from src.utils.text import clean_str, map_unique
+
+
+def test_map_unique_matches_map():
+    s = pd.Series(["a", "b", np.nan, "a", np.nan, "c"], index=[5, 4, 3, 2, 1, 0], name="team")
+    calls = []
+
+    def fn(v):
+        calls.append(v)
+        return f"<{v}>"
+
+    out = map_unique(s, fn)
+    pd.testing.assert_series_equal(out, s.map(lambda v: f"<{v}>").astype(object))
+    # One call per distinct value, the missing ones included
+    assert len(calls) == 4
+
+    kept = map_unique(s, fn, skipna=True)
+    assert kept.isna().tolist() == [False, False, True, False, True, False]
+    assert kept.dropna().tolist() == ["<a>", "<b>", "<a>", "<c>"]
+
+
+def test_clean_str_matches_astype_strip():
+    s = pd.Series([" Arsenal", "Chelsea ", np.nan, 3, " Arsenal"])
+    pd.testing.assert_series_equal(clean_str(s), s.astype(str).str.strip())
+    # None (e.g. a null from an Arrow read) becomes 'nan' too, as in a pd.read_csv column
+    assert clean_str(pd.Series(["a", None])).tolist() == ["a", "nan"]